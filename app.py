@@ -1,117 +1,172 @@
-import json
+import gzip
 import os
-from flask import Flask, render_template, request, session, redirect, url_for, jsonify
+import secrets
+from flask import Flask, render_template, request, session, redirect, url_for, jsonify, abort
 import random
-from datetime import datetime
+from datetime import date
+from daily import SCHEDULE_FILE
+from game_store import create_store
+from dataset import DatasetHolder
+from game_logic import compare_guess, check_win
+from event_log import create_event_log
+from stats_store import create_stats_store
+from game_token import GameTokens
+from silhouette import silhouette_bytes, silhouette_path, bundled, resolution_for_level, headshot_url
+import time_attack as attack
+import metrics
+import offload
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev')
 
-# Load all cached data
-with open(os.path.join(os.path.dirname(__file__), 'players.json')) as f:
-    ALL_PLAYERS = json.load(f)
-with open(os.path.join(os.path.dirname(__file__), 'player_details.json')) as f:
-    PLAYER_DETAILS = json.load(f)
-with open(os.path.join(os.path.dirname(__file__), 'player_stats.json')) as f:
-    PLAYER_STATS = json.load(f)
-
-# Helper to get conference/division from TEAM_ABBREVIATION
-def get_conf_div(team_abbr):
-    nba_teams = {
-        'ATL': ('East', 'Southeast'), 'BOS': ('East', 'Atlantic'), 'BKN': ('East', 'Atlantic'), 'CHA': ('East', 'Southeast'),
-        'CHI': ('East', 'Central'), 'CLE': ('East', 'Central'), 'DAL': ('West', 'Southwest'), 'DEN': ('West', 'Northwest'),
-        'DET': ('East', 'Central'), 'GSW': ('West', 'Pacific'), 'HOU': ('West', 'Southwest'), 'IND': ('East', 'Central'),
-        'LAC': ('West', 'Pacific'), 'LAL': ('West', 'Pacific'), 'MEM': ('West', 'Southwest'), 'MIA': ('East', 'Southeast'),
-        'MIL': ('East', 'Central'), 'MIN': ('West', 'Northwest'), 'NOP': ('West', 'Southwest'), 'NYK': ('East', 'Atlantic'),
-        'OKC': ('West', 'Northwest'), 'ORL': ('East', 'Southeast'), 'PHI': ('East', 'Atlantic'), 'PHX': ('West', 'Pacific'),
-        'POR': ('West', 'Northwest'), 'SAC': ('West', 'Pacific'), 'SAS': ('West', 'Southwest'), 'TOR': ('East', 'Atlantic'),
-        'UTA': ('West', 'Northwest'), 'WAS': ('East', 'Southeast')
-    }
-    return nba_teams.get(team_abbr, ('N/A', 'N/A'))
-
-def get_player_info(player_id):
-    return PLAYER_DETAILS.get(str(player_id), {})
-
-def get_player_clue(player_id):
-    stats = PLAYER_STATS.get(str(player_id), {})
-    if not stats:
-        return "No stats available."
-    try:
-        gp = float(stats.get('GP', 0))
-        ppg = float(stats.get('PTS', 0)) / gp if gp else 0
-        rpg = float(stats.get('REB', 0)) / gp if gp else 0
-        apg = float(stats.get('AST', 0)) / gp if gp else 0
-        return f"Career averages - PPG: {ppg:.1f}, RPG: {rpg:.1f}, APG: {apg:.1f}"
-    except Exception:
-        return "Clue unavailable."
-
-def compare_guess(guessed, target):
-    guessed_conf, guessed_div = get_conf_div(guessed.get('TEAM_ABBREVIATION'))
-    target_conf, target_div = get_conf_div(target.get('TEAM_ABBREVIATION'))
-    # Height arrow logic
-    def to_inches(h):
-        if isinstance(h, int): return h
-        if not h or h == 'N/A': return None
-        if '-' in h:
-            ft, inch = h.split('-')
-            return int(ft)*12 + int(inch)
-        return int(h)
-    g_h = to_inches(guessed.get('HEIGHT'))
-    t_h = to_inches(target.get('HEIGHT'))
-    height_arrow = ''
-    if g_h is not None and t_h is not None:
-        if g_h < t_h:
-            height_arrow = '↑'
-        elif g_h > t_h:
-            height_arrow = '↓'
-    # Weight arrow logic
-    guessed_weight = guessed.get('WEIGHT')
-    target_weight = target.get('WEIGHT')
-    weight_arrow = ''
-    try:
-        gw = int(guessed_weight) if guessed_weight else None
-        tw = int(target_weight) if target_weight else None
-        if gw is not None and tw is not None and abs(gw - tw) > 10:
-            if gw < tw:
-                weight_arrow = '↑'
-            elif gw > tw:
-                weight_arrow = '↓'
-    except Exception:
-        weight_arrow = ''
-    feedback = {
-        'name': guessed.get('DISPLAY_FIRST_LAST', guessed.get('full_name', 'Unknown')),
-        'team': guessed.get('TEAM_ABBREVIATION', 'N/A'),
-        'position': guessed.get('POSITION', 'N/A'),
-        'height': guessed.get('HEIGHT', 'N/A'),
-        'weight': int(guessed.get('WEIGHT', 0)) if guessed.get('WEIGHT') else 0,
-        'conference': guessed_conf,
-        'division': guessed_div,
-        'team_match': guessed.get('TEAM_ID') == target.get('TEAM_ID'),
-        'position_match': guessed.get('POSITION') and target.get('POSITION') and guessed.get('POSITION').lower() == target.get('POSITION').lower(),
-        'height_match': guessed.get('HEIGHT') == target.get('HEIGHT'),
-        'weight_match': abs(int(guessed.get('WEIGHT') or 0) - int(target.get('WEIGHT') or 0)) <= 10 if guessed.get('WEIGHT') and target.get('WEIGHT') else False,
-        'conference_match': guessed_conf == target_conf and guessed_conf != 'N/A',
-        'division_match': guessed_div == target_div and guessed_div != 'N/A',
-        'height_arrow': height_arrow,
-        'weight_arrow': weight_arrow,
-    }
-    return feedback
-
-def check_win(guessed, target):
-    return guessed.get('DISPLAY_FIRST_LAST', guessed.get('full_name', '')).lower() == target.get('DISPLAY_FIRST_LAST', target.get('full_name', '')).lower()
+# Player table, name index, solver and daily schedule, versioned and reloaded
+# in the background when the cache files change (see dataset.py). Each game
+# records the version it started on and keeps using it.
+DATASETS = DatasetHolder()
+
+# Game state lives server-side; the session cookie only carries the game ID
+GAME_STORE = create_store()
+
+# Guesses, wins and losses, written off the request path (see event_log.py)
+EVENTS = create_event_log()
+
+# Streaks, daily results and the leaderboard, shared by all workers (see stats_store.py)
+STATS = create_stats_store()
+LEADERBOARD_NAME_MAX = 20
+
+# JSON API games live entirely in signed tokens (see game_token.py)
+GAME_TOKENS = GameTokens(app.secret_key)
+MAX_BATCH_GUESSES = 6
+
+MAX_ATTEMPTS = 6
+
+# Suggestion responses are a pure function of the dataset version and query
+SUGGESTION_MAX_AGE = 300
+# CLIENT_NAME_INDEX=1 has the page download the name list once and match locally
+CLIENT_NAME_INDEX = os.environ.get('CLIENT_NAME_INDEX', '0') == '1'
+
+# Request latency, cookie size and load-time metrics at /metrics (see metrics.py)
+metrics.init_app(app)
+compare_guess = metrics.timed('compare_guess')(compare_guess)
+
+def get_player_info(player_id, data=None):
+    return (data or DATASETS.current()).player_info(player_id)
+
+def get_player_clue(player_id, reveal_level=0, data=None):
+    # Precomputed clue ladder (see clues.py): everything unlocked so far
+    return (data or DATASETS.current()).clues(player_id, reveal_level)
+
+def game_data(game):
+    return DATASETS.get(game.get('version'))
+
+def game_target(game):
+    # (dataset, target row) for a stored game. The target is None when the
+    # game started on a data version this worker has not loaded yet, for
+    # example one another worker reloaded first; DATASETS.get() has already
+    # started loading it.
+    data = game_data(game)
+    return data, data.player_info(game['target_id'])
+
+def get_user_id():
+    # Anonymous player ID the stats store keys streaks and results on
+    user_id = session.get('user_id')
+    if not user_id:
+        user_id = session['user_id'] = secrets.token_urlsafe(9)
+    return user_id
 
 def get_streak():
     return session.get('streak', 0)
 
 def update_streak(won):
+    # The session copy is what pages show; the stats store keeps the record
     streak = session.get('streak', 0)
     if won:
         streak += 1
     else:
         streak = 0
     session['streak'] = streak
+    STATS.record_game(get_user_id(), won)
     return streak
 
+def current_game(session_key):
+    game_id = session.get(session_key)
+    game = GAME_STORE.get(game_id) if game_id else None
+    return game_id, game
+
+def start_game(session_key, target_id, data, **extra):
+    game = {'target_id': target_id, 'guesses': [], 'reveal_level': 0, 'version': data.version, **extra}
+    game_id = GAME_STORE.new_game_id()
+    GAME_STORE.put(game_id, game)
+    session[session_key] = game_id
+    return game_id, game
+
+def end_game(game_id, session_key='game_id'):
+    GAME_STORE.delete(game_id)
+    session.pop(session_key, None)
+
+def resolve_guess(data, guess_name):
+    # Returns (player row, '') or (None, error message)
+    with metrics.timer('resolve_name'):
+        found = data.name_index.best_match(guess_name.strip())
+    if not found:
+        return None, 'Player not found. Try again.'
+    guessed = data.player_info(found.id)
+    if not guessed:
+        return None, 'Player data not found. Try again.'
+    return guessed, ''
+
+def play_guess(game_id, game, target, session_key, max_attempts):
+    # Resolves the submitted name and applies it to the game.
+    # Returns (message, finished).
+    data = game_data(game)
+    guessed, error = resolve_guess(data, request.form['guess'])
+    if not guessed:
+        return error, False
+    guesses = game['guesses']
+    feedback = compare_guess(guessed, target)
+    guesses.append(feedback)
+    mode = 'daily' if session_key == 'daily_game_id' else 'random'
+    EVENTS.emit('guess', game=game_id, mode=mode, target=target.id, guess=guessed.id, attempt=len(guesses), version=data.version)
+    if check_win(guessed, target):
+        EVENTS.emit('win', game=game_id, mode=mode, target=target.id, attempt=len(guesses), version=data.version)
+        update_streak(True)
+        if mode == 'daily':
+            STATS.record_daily(get_user_id(), game['date'], True, len(guesses))
+        end_game(game_id, session_key)
+        return f'🎉 Correct! The player was {target.name}!', True
+    if len(guesses) >= max_attempts:
+        EVENTS.emit('loss', game=game_id, mode=mode, target=target.id, attempt=len(guesses), version=data.version)
+        update_streak(False)
+        if mode == 'daily':
+            STATS.record_daily(get_user_id(), game['date'], False, len(guesses))
+        end_game(game_id, session_key)
+        return f'❌ Game Over! The player was {target.name}!', True
+    game['reveal_level'] = game.get('reveal_level', 0) + 1
+    GAME_STORE.put(game_id, game)
+    return '', False
+
+def silhouette_url_for(game_id, game):
+    # Versioned by game and reveal level so browsers can cache each step;
+    # time-attack runs add the queue position, since the target changes
+    level = game.get('reveal_level', 0)
+    if not resolution_for_level(level):
+        return ''
+    if 'position' in game:
+        return url_for('silhouette', game_id=game_id, level=level, n=game['position'])
+    return url_for('silhouette', game_id=game_id, level=level)
+
+def prefetch_silhouettes(run):
+    # Renders the next time-attack players' silhouettes in the background;
+    # skipped when the blocking pool is busy (see offload.py)
+    for person_id, res in attack.prefetch_keys(run):
+        offload.submit(silhouette_path, person_id, res)
+
+def render_game(guesses, message, clues, silhouette_url='', daily=None, era=None, time_attack=None):
+    max_attempts = MAX_ATTEMPTS
+    progress = int((len(guesses) / max_attempts) * 100)
+    name_index_url = url_for('client_name_index', version=DATASETS.current().version) if CLIENT_NAME_INDEX else ''
+    return render_template('index.html', guesses=guesses, message=message, clues=clues, silhouette_url=silhouette_url, streak=get_streak(), progress=progress, max_attempts=max_attempts, daily=daily, era=era, name_index_url=name_index_url, time_attack=time_attack)
+
 @app.route('/rules', methods=['GET', 'POST'])
 def rules():
     if request.method == 'POST':
@@ -123,61 +178,298 @@ def index():
     if 'seen_rules' not in session:
         session['seen_rules'] = True
         return redirect(url_for('rules'))
-    if 'target_player' not in session:
-        player = random.choice(ALL_PLAYERS)
-        info = get_player_info(player['id'])
-        session['target_player'] = info
-        session['guesses'] = []
-        session['reveal_level'] = 0
-    target = session['target_player']
-    guesses = session.get('guesses', [])
+    game_id, game = current_game('game_id')
     message = ''
-    clue = get_player_clue(target.get('PERSON_ID', target.get('id')))
-    silhouette_url = ''
-    streak = get_streak()
-    max_attempts = 6
-    progress = int((len(guesses) / max_attempts) * 100)
+    if game is not None:
+        data, target = game_target(game)
+        if target is None:
+            end_game(game_id)
+            game = None
+            message = 'That game is no longer available. Here is a new player.'
+    if game is None:
+        data = DATASETS.current()
+        # ?era=1990s or ?era=1984-1998 limits targets on all-time data
+        era = request.args.get('era') if data.era_range(request.args.get('era')) else None
+        pool = data.pool(era) or data.target_pool
+        game_id, game = start_game('game_id', random.choice(pool).id, data, era=era)
+        target = data.player_info(game['target_id'])
+    finished = False
+    if request.method == 'POST' and not message:
+        message, finished = play_guess(game_id, game, target, 'game_id', MAX_ATTEMPTS)
+    clues = data.clues(target.id, game.get('reveal_level', 0))
+    silhouette_url = url_for('headshot', person_id=target.id) if finished else silhouette_url_for(game_id, game)
+    return render_game(game['guesses'], message, clues, silhouette_url, era=game.get('era'))
+
+@app.route('/daily', methods=['GET', 'POST'])
+def daily():
+    data = DATASETS.current()
+    puzzle = data.daily_schedule().today()
+    game_id, game = current_game('daily_game_id')
+    if game is None or game.get('date') != puzzle.date:
+        if session.get('daily_done') == puzzle.date:
+            return render_game([], f'You already played Daily #{puzzle.number}. Come back tomorrow!', [puzzle.clue], daily=puzzle)
+        game_id, game = start_game('daily_game_id', puzzle.target.id, data, date=puzzle.date)
+    elif game.get('version') != data.version:
+        # Finish today's game against the data it started with
+        data = game_data(game)
+        puzzle = data.daily_schedule().puzzle_for(date.fromisoformat(game['date']))
+    message = ''
+    finished = False
+    if request.method == 'POST':
+        message, finished = play_guess(game_id, game, puzzle.target, 'daily_game_id', MAX_ATTEMPTS)
+        if finished:
+            session['daily_done'] = puzzle.date
+    clues = data.clues(puzzle.target.id, game.get('reveal_level', 0))
+    silhouette_url = url_for('headshot', person_id=puzzle.target.id) if finished else silhouette_url_for(game_id, game)
+    return render_game(game['guesses'], message, clues, silhouette_url, daily=puzzle)
+
+def play_time_attack(game_id, game, data, target):
+    # Applies a guess or skip to a running time-attack run; returns the message
+    if request.form.get('skip'):
+        attack.advance(game, False)
+        return f'Skipped. The player was {target.name}.'
+    guessed, error = resolve_guess(data, request.form.get('guess', ''))
+    if not guessed:
+        return error
+    game['guesses'].append(compare_guess(guessed, target))
+    EVENTS.emit('guess', game=game_id, mode='time_attack', target=target.id, guess=guessed.id, attempt=len(game['guesses']), version=data.version)
+    if check_win(guessed, target):
+        attack.advance(game, True)
+        return f'✅ {target.name}! Next player.'
+    if attack.miss(game):
+        return f'Out of guesses. The player was {target.name}.'
+    return ''
+
+def finish_time_attack(game_id, game, data):
+    game['finished'] = True
+    session['time_attack_best'] = max(session.get('time_attack_best', 0), game['score'])
+    EVENTS.emit('time_attack', game=game_id, score=game['score'], skipped=game['skipped'], version=data.version)
+    STATS.record_time_attack(get_user_id(), game['score'])
+
+@app.route('/time_attack', methods=['GET', 'POST'])
+def time_attack():
+    # The deadline lives in the stored run and is checked on every request;
+    # the page only counts down for display and reloads when it hits zero
+    game_id, game = current_game('time_attack_id')
+    message = ''
+    restart = game is None or (request.args.get('new') and game['finished'])
+    if not restart and not game['finished']:
+        data, target = game_target(game)
+        if target is None:
+            restart = True
+            message = 'That run is no longer available. Here is a new one.'
+    if restart:
+        if game is not None:
+            end_game(game_id, 'time_attack_id')
+        data = DATASETS.current()
+        game = attack.new_run(data.target_pool)
+        game_id, game = start_game('time_attack_id', game.pop('target_id'), data, **game)
+        prefetch_silhouettes(game)
+    data, target = game_target(game)
+    if not game['finished']:
+        if attack.expired(game):
+            finish_time_attack(game_id, game, data)
+        elif request.method == 'POST' and not message:
+            position = game['position']
+            message = play_time_attack(game_id, game, data, target)
+            if game['position'] != position:
+                prefetch_silhouettes(game)
+        GAME_STORE.put(game_id, game)
+    if game['finished']:
+        message = f"⏱️ Time's up! You solved {game['score']} player{'' if game['score'] == 1 else 's'}."
+    state = {'score': game['score'], 'best': session.get('time_attack_best', 0), 'finished': game['finished'],
+             'time_left': round(attack.time_left(game), 1)}
+    clues = [] if game['finished'] else data.clues(game['target_id'], game['reveal_level'])
+    silhouette_url = '' if game['finished'] else silhouette_url_for(game_id, game)
+    return render_game(game['guesses'], message, clues, silhouette_url, time_attack=state)
+
+def leaderboard_rows():
+    return [{'rank': rank, 'name': row.name or f'Player {row.user_id[:4]}', 'best_streak': row.best_streak,
+             'streak': row.streak, 'wins': row.wins, 'games': row.games}
+            for rank, row in enumerate(STATS.leaderboard(), 1)]
+
+@app.route('/leaderboard', methods=['GET', 'POST'])
+def leaderboard():
+    # Served from the stats store's cached ranking, not a query per view
     if request.method == 'POST':
-        guess_name = request.form['guess'].strip()
-        found = [p for p in ALL_PLAYERS if guess_name.lower() in p['full_name'].lower()]
-        if not found:
-            message = 'Player not found. Try again.'
-        else:
-            guessed = get_player_info(found[0]['id'])
-            if not guessed:
-                message = 'Player data not found. Try again.'
-            else:
-                feedback = compare_guess(guessed, target)
-                guesses.append(feedback)
-                session['guesses'] = guesses
-                if check_win(guessed, target):
-                    message = f'🎉 Correct! The player was {target.get("DISPLAY_FIRST_LAST", target.get("full_name", ""))}!'
-                    update_streak(True)
-                    session.pop('target_player')
-                elif len(guesses) >= max_attempts:
-                    message = f'❌ Game Over! The player was {target.get("DISPLAY_FIRST_LAST", target.get("full_name", ""))}!'
-                    update_streak(False)
-                    session.pop('target_player')
-                else:
-                    session['reveal_level'] = session.get('reveal_level', 0) + 1
-                streak = get_streak()
-                progress = int((len(guesses) / max_attempts) * 100)
-    return render_template('index.html', guesses=guesses, message=message, clue=clue, silhouette_url=silhouette_url, streak=streak, progress=progress, max_attempts=max_attempts)
+        name = ' '.join(request.form.get('name', '').split())[:LEADERBOARD_NAME_MAX]
+        if name:
+            STATS.set_name(get_user_id(), name)
+            session['leaderboard_name'] = name
+        return redirect(url_for('leaderboard'))
+    return render_template('leaderboard.html', rows=leaderboard_rows(), streak=get_streak(),
+                           name=session.get('leaderboard_name', ''))
+
+@app.route('/api/leaderboard')
+def api_leaderboard():
+    return jsonify({'leaderboard': leaderboard_rows()})
 
 @app.route('/reset')
 def reset():
-    session.pop('target_player', None)
-    session.pop('guesses', None)
-    session.pop('reveal_level', None)
-    return redirect(url_for('index'))
+    game_id = session.get('game_id')
+    if game_id:
+        end_game(game_id)
+    return redirect(url_for('index', era=request.args.get('era')))
+
+@app.route('/silhouette/<game_id>/<int:level>.png')
+def silhouette(game_id, level):
+    # Only the session's own game, and only up to its current reveal level
+    if game_id not in (session.get('game_id'), session.get('daily_game_id'), session.get('time_attack_id')):
+        abort(404)
+    game = GAME_STORE.get(game_id)
+    if game is None or level > game.get('reveal_level', 0) or not resolution_for_level(level):
+        abort(404)
+    png = offload.run(silhouette_bytes, game['target_id'], resolution_for_level(level))
+    response = app.response_class(png, mimetype='image/png')
+    response.cache_control.private = True
+    response.cache_control.max_age = 3600
+    return response
+
+@app.route('/headshot/<int:person_id>.png')
+def headshot(person_id):
+    data = bundled(person_id, 'full')
+    if data is None:
+        return redirect(headshot_url(person_id))
+    response = app.response_class(bytes(data), mimetype='image/png')
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+    return response
+
+@app.route('/hint')
+def hint():
+    _, game = current_game('daily_game_id' if request.args.get('mode') == 'daily' else 'game_id')
+    if game is None:
+        return jsonify({'error': 'No game in progress.'}), 404
+    data = game_data(game)
+    solver = data.solver_for(game.get('era'))
+    if solver is None:
+        return jsonify({'error': 'Hints are not available for this player pool.'}), 404
+    remaining = solver.candidates_from_feedback(game['guesses'])
+    suggestions = [{'name': data.table.get(pid).full_name, 'information': round(score, 3)}
+                   for pid, score in solver.best_guesses(remaining, top=3)]
+    return jsonify({'remaining': int(remaining.sum()), 'suggestions': suggestions})
+
+def api_state(game, data, status):
+    body = {'status': status, 'attempts': len(game.guesses), 'max_attempts': MAX_ATTEMPTS,
+            'clues': list(data.clues(game.target_id, len(game.guesses))), 'version': data.version}
+    if status == 'playing':
+        body['token'] = GAME_TOKENS.dumps(game)
+    else:
+        body['answer'] = data.table.get(game.target_id).name
+    return body
+
+def json_body():
+    # The request's JSON object, {} when there is no body, None for anything
+    # that is not an object (arrays, scalars, malformed JSON)
+    body = request.get_json(silent=True)
+    if body is None and not request.get_data():
+        return {}
+    return body if isinstance(body, dict) else None
+
+@app.route('/api/game', methods=['POST'])
+def api_game():
+    # Starts a game: {"mode": "random" | "daily", "era": "1990s"} -> token and clue
+    body = json_body()
+    if body is None:
+        return jsonify({'error': 'Send a JSON object.'}), 400
+    mode = body.get('mode', 'random')
+    if not isinstance(body.get('era', ''), str):
+        return jsonify({'error': 'era must be a string such as "1990s" or "1984-1998".'}), 400
+    data = DATASETS.current()
+    if mode == 'daily':
+        target_id = data.daily_schedule().today().target.id
+    elif mode == 'random':
+        target_id = random.choice(data.pool(body.get('era')) or data.target_pool).id
+    else:
+        return jsonify({'error': 'mode must be "random" or "daily".'}), 400
+    return jsonify(api_state(GAME_TOKENS.new_game(target_id, data.version, mode), data, 'playing'))
+
+@app.route('/api/guess', methods=['POST'])
+def api_guess():
+    # {"token": ..., "guess": "name"} or {"token": ..., "guesses": [names]}.
+    # Guesses apply in order until the game ends; names that do not resolve
+    # get an error entry and do not use up an attempt.
+    body = json_body()
+    if body is None:
+        return jsonify({'error': 'Send a JSON object.'}), 400
+    game = GAME_TOKENS.loads(body.get('token', ''))
+    if game is None:
+        return jsonify({'error': 'Invalid or missing game token.'}), 400
+    names = body['guesses'] if isinstance(body.get('guesses'), list) else [body.get('guess')]
+    if not names or len(names) > MAX_BATCH_GUESSES or not all(isinstance(name, str) for name in names):
+        return jsonify({'error': f'Send "guess" or 1-{MAX_BATCH_GUESSES} "guesses" as strings.'}), 400
+    data = DATASETS.get(game.version)
+    target = data.player_info(game.target_id)
+    if target is None or len(game.guesses) >= MAX_ATTEMPTS:
+        return jsonify({'error': 'Game is over.'}), 400
+    status = 'playing'
+    results = []
+    for name in names:
+        if status != 'playing':
+            results.append({'guess': name, 'error': 'Game is over.'})
+            continue
+        guessed, error = resolve_guess(data, name)
+        if not guessed:
+            results.append({'guess': name, 'error': error})
+            continue
+        game.guesses.append(guessed.id)
+        results.append({'guess': name, 'feedback': compare_guess(guessed, target)})
+        EVENTS.emit('guess', game=game.nonce, mode=game.mode, target=target.id, guess=guessed.id, attempt=len(game.guesses), version=data.version)
+        if check_win(guessed, target):
+            status = 'won'
+        elif len(game.guesses) >= MAX_ATTEMPTS:
+            status = 'lost'
+        if status != 'playing':
+            EVENTS.emit('win' if status == 'won' else 'loss', game=game.nonce, mode=game.mode, target=target.id, attempt=len(game.guesses), version=data.version)
+    return jsonify({'results': results, **api_state(game, data, status)})
 
 @app.route('/player_suggestions')
 def player_suggestions():
     query = request.args.get('q', '').strip().lower()
     if not query or len(query) < 2:
         return jsonify([])
-    matches = [p['full_name'] for p in ALL_PLAYERS if query in p['full_name'].lower()][:10]
-    return jsonify(matches)
+    data = DATASETS.current()
+    if data.version in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        with metrics.timer('suggest'):
+            response = app.response_class(data.suggestions_json(query), mimetype='application/json')
+    response.set_etag(data.version)
+    response.cache_control.public = True
+    response.cache_control.max_age = SUGGESTION_MAX_AGE
+    return response
+
+@app.route('/player_index/<version>.json')
+def client_name_index(version):
+    data = DATASETS.get(version)
+    body = data.client_index()
+    if 'gzip' in request.accept_encodings:
+        response = app.response_class(body, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = app.response_class(gzip.decompress(body), mimetype='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.cache_control.public = True
+    if data.version == version:
+        # The URL names the version, so the body never changes
+        response.cache_control.max_age = 365 * 86400
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.max_age = SUGGESTION_MAX_AGE
+    return response
+
+def create_app():
+    # Entry point for gunicorn.conf.py. With preload it runs once in the
+    # master, so the data built here is shared copy-on-write by every worker
+    data = DATASETS.current()
+    # Under gevent the solver runs on one core, so building the schedule here
+    # would hold up startup: it has to come prebuilt (python daily.py)
+    if offload.gevent_patched() and not os.path.exists(os.path.join(data.data_dir, SCHEDULE_FILE)):
+        raise RuntimeError(f'{SCHEDULE_FILE} is missing; run python daily.py before starting gevent workers')
+    data.daily_schedule()
+    if CLIENT_NAME_INDEX:
+        data.client_index()
+    return app
 
 if __name__ == '__main__':
     app.run(debug=True)
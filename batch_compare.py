@@ -0,0 +1,96 @@
+import numpy as np
+from player_table import RECORD, RECORD_FIELDS
+
+# Vectorized compare_guess over the player table. The table's fixed-width
+# records are viewed as a NumPy structured array (no copy), and comparisons
+# broadcast guesses against targets into a feedback matrix. The web path keeps
+# using app.compare_guess for a single pair; this is for analytics, puzzle
+# pre-validation and the solver.
+
+_FIELD_TYPES = {
+    'id': '<i4', 'team_id': '<i4', 'height_in': '<i2', 'weight': '<i2',
+    'conf': 'u1', 'div': 'u1', 'flags': 'u1', 'ppg': '<f8', 'rpg': '<f8', 'apg': '<f8',
+}
+_dtype_fields = []
+for _name in RECORD_FIELDS:
+    _dtype_fields.append((_name, _FIELD_TYPES.get(_name, '<u4')))  # string fields are table indexes
+    if _name == 'flags':
+        _dtype_fields.append(('_pad', 'V1'))
+RECORD_DTYPE = np.dtype(_dtype_fields)
+assert RECORD_DTYPE.itemsize == RECORD.size
+
+FEEDBACK_DTYPE = np.dtype([
+    ('team_match', '?'), ('position_match', '?'), ('height_match', '?'), ('weight_match', '?'),
+    ('conference_match', '?'), ('division_match', '?'),
+    ('height_arrow', 'i1'), ('weight_arrow', 'i1'),  # +1 is '↑', -1 is '↓', 0 is no arrow
+])
+ARROWS = {1: '↑', -1: '↓', 0: ''}
+MATCH_FIELDS = ('team_match', 'position_match', 'height_match', 'weight_match', 'conference_match', 'division_match')
+
+
+class BatchComparer:
+    def __init__(self, table):
+        self.table = table
+        self.columns = np.frombuffer(table.records, dtype=RECORD_DTYPE)
+        self.ids = self.columns['id']
+        self.positions = {int(pid): i for i, pid in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.columns)
+
+    def to_positions(self, player_ids):
+        if player_ids is None:
+            return np.arange(len(self.columns))
+        return np.fromiter((self.positions[int(pid)] for pid in player_ids), dtype=np.intp)
+
+    def compare_positions(self, guess_pos, target_pos):
+        # Feedback matrix of shape (len(guess_pos), len(target_pos))
+        g = self.columns[np.asarray(guess_pos)][:, None]
+        t = self.columns[np.asarray(target_pos)][None, :]
+        out = np.zeros((g.shape[0], t.shape[1]), dtype=FEEDBACK_DTYPE)
+        out['team_match'] = g['team_id'] == t['team_id']
+        out['position_match'] = (g['position_key'] != 0) & (g['position_key'] == t['position_key'])
+        out['height_match'] = g['height'] == t['height']
+        out['conference_match'] = (g['conf'] != 0) & (g['conf'] == t['conf'])
+        out['division_match'] = (g['div'] != 0) & (g['div'] == t['div'])
+        g_h = g['height_in'].astype(np.int32)
+        t_h = t['height_in'].astype(np.int32)
+        out['height_arrow'] = np.where((g_h >= 0) & (t_h >= 0), np.sign(t_h - g_h), 0)
+        g_w = g['weight'].astype(np.int32)
+        t_w = t['weight'].astype(np.int32)
+        known = (g_w != 0) & (t_w != 0)
+        close = np.abs(g_w - t_w) <= 10
+        out['weight_match'] = known & close
+        out['weight_arrow'] = np.where(known & ~close, np.sign(t_w - g_w), 0)
+        return out
+
+    def compare(self, guess_ids=None, target_ids=None):
+        # None means the whole roster on that axis
+        return self.compare_positions(self.to_positions(guess_ids), self.to_positions(target_ids))
+
+    def one_vs_many(self, guess_id, target_ids=None):
+        return self.compare([guess_id], target_ids)[0]
+
+    def many_vs_one(self, guess_ids, target_id):
+        return self.compare(guess_ids, [target_id])[:, 0]
+
+    def codes(self, guess_ids=None, target_ids=None):
+        return feedback_codes(self.compare(guess_ids, target_ids))
+
+
+def feedback_codes(matrix):
+    # Packs each feedback cell into one small int: six match bits plus two
+    # trits for the arrows. Equal codes mean the player sees identical feedback.
+    code = np.zeros(matrix.shape, dtype=np.uint16)
+    for bit, field in enumerate(MATCH_FIELDS):
+        code |= matrix[field].astype(np.uint16) << bit
+    code += (matrix['height_arrow'].astype(np.int16) + 1).astype(np.uint16) * 64
+    code += (matrix['weight_arrow'].astype(np.int16) + 1).astype(np.uint16) * 192
+    return code
+
+
+def cell_to_dict(cell):
+    feedback = {field: bool(cell[field]) for field in MATCH_FIELDS}
+    feedback['height_arrow'] = ARROWS[int(cell['height_arrow'])]
+    feedback['weight_arrow'] = ARROWS[int(cell['weight_arrow'])]
+    return feedback
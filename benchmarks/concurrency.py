@@ -0,0 +1,129 @@
+import argparse
+import json
+import random
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+from fixture import DEFAULT_PLAYERS, DEFAULT_SEED, environment, make_roster, write_roster
+from loadgen import free_port, run, start_server
+
+# Concurrency the web app sustains with sync and with gevent gunicorn workers
+# on the same machine. For each worker class it starts gunicorn through
+# gunicorn.conf.py on the synthetic roster, parks --slow-clients connections
+# that trickle a request header (a phone on a bad network), then ramps up
+# simulated players who type names into the suggestion box and guess. A level
+# is sustained when it has no errors and p99 latency stays under --slo-ms.
+#
+#   python benchmarks/concurrency.py --workers 2 --levels 8,32,128 --slow-clients 4
+#
+# Client threads share one interpreter; at the highest levels the generator
+# itself can become the limit, so compare classes at the same level.
+
+MIN_TYPED = 2
+MAX_TYPED = 8
+
+
+def type_and_guess(base_url, names, flows, seed, record):
+    # Each guess is typed: one /player_suggestions call per keystroke from the
+    # second character, then the POST
+    import requests
+    rng = random.Random(seed)
+    http = requests.Session()
+
+    def step(name, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            status = http.request(method, base_url + path, allow_redirects=False, timeout=30, **kwargs).status_code
+        except requests.RequestException:
+            status = 0
+        record(name, time.perf_counter() - started, 0 < status < 400)
+        return status
+
+    for _ in range(flows):
+        if step('index', 'GET', '/') == 302:
+            step('index', 'GET', '/')
+        name = rng.choice(names)
+        for n in range(MIN_TYPED, min(len(name), MAX_TYPED) + 1):
+            step('suggest', 'GET', '/player_suggestions', params={'q': name[:n]})
+        step('guess', 'POST', '/', data={'guess': name})
+
+
+def slow_client(port, stop):
+    # Holds a connection open by sending one header line a second
+    while not stop.is_set():
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=5) as s:
+                s.sendall(b'GET /rules HTTP/1.1\r\nHost: localhost\r\n')
+                while not stop.wait(1.0):
+                    s.sendall(b'X-Slow: 1\r\n')
+        except OSError:
+            stop.wait(0.5)
+
+
+def measure_class(worker_class, args, names):
+    data_dir = write_roster(tempfile.mkdtemp(prefix='hoopmind-concurrency-'), args.players, args.seed)
+    port = free_port()
+    stop = threading.Event()
+    proc = start_server('gunicorn', data_dir, port, args.workers, worker_class)
+    base_url = f'http://127.0.0.1:{port}'
+    levels = []
+    try:
+        # Warm-up, then the slow connections stay parked for every level
+        run(base_url, names, 2, 1, args.seed, type_and_guess)
+        for _ in range(args.slow_clients):
+            threading.Thread(target=slow_client, args=(port, stop), daemon=True).start()
+        time.sleep(1.0)
+        for clients in args.levels:
+            result = run(base_url, names, clients, args.flows, args.seed, type_and_guess)
+            sustained = result['errors'] == 0 and result['overall']['p99_ms'] <= args.slo_ms
+            levels.append({'clients': clients, 'sustained': sustained, 'requests_per_s': result['requests_per_s'],
+                           'errors': result['errors'], 'p50_ms': result['overall']['p50_ms'],
+                           'p99_ms': result['overall']['p99_ms'], 'steps': result['steps']})
+            print(f"{worker_class:>8} {clients:>6} clients  {result['requests_per_s']:8.1f} req/s  "
+                  f"p50 {result['overall']['p50_ms']:7.1f} ms  p99 {result['overall']['p99_ms']:8.1f} ms  "
+                  f"errors {result['errors']:>4}  {'ok' if sustained else 'over SLO'}", flush=True)
+    finally:
+        stop.set()
+        proc.terminate()
+        proc.wait(timeout=30)
+        shutil.rmtree(data_dir, ignore_errors=True)
+    # The highest level reached before the first failure; a later level that
+    # happens to pass does not count
+    sustained = 0
+    for level in levels:
+        if not level['sustained']:
+            break
+        sustained = level['clients']
+    return {'worker_class': worker_class, 'max_sustained_clients': sustained, 'levels': levels}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the concurrency sync and gevent workers sustain.")
+    parser.add_argument('--classes', default='sync,gevent', help="comma-separated gunicorn worker classes")
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn worker processes, the same for every class")
+    parser.add_argument('--levels', default='4,16,64', help="comma-separated concurrent player counts")
+    parser.add_argument('--flows', type=int, default=5, help="typed guesses per player at each level")
+    parser.add_argument('--slow-clients', type=int, default=0, help="connections that trickle headers throughout")
+    parser.add_argument('--slo-ms', type=float, default=250.0, help="p99 latency a level must stay under")
+    parser.add_argument('--players', type=int, default=DEFAULT_PLAYERS)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--output', help="write the results as JSON")
+    args = parser.parse_args()
+    args.levels = [int(level) for level in args.levels.split(',')]
+
+    names = [p['full_name'] for p in make_roster(args.players, args.seed)[0]]
+    results = [measure_class(worker_class, args, names) for worker_class in args.classes.split(',')]
+    report = {'benchmark': 'concurrency', 'workers': args.workers, 'flows': args.flows, 'slow_clients': args.slow_clients,
+              'slo_ms': args.slo_ms, 'players': args.players, 'seed': args.seed, **environment(), 'results': results}
+    for result in results:
+        print(f"{result['worker_class']}: sustains {result['max_sustained_clients']} concurrent players", flush=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from player_table import NBA_TEAMS, SOURCE_FILES  # noqa: E402
+
+# Synthetic roster for offline benchmarks. Same seed and size give the same
+# players.json / player_details.json / player_stats.json on every machine, so
+# numbers from different commits are measured against identical data.
+
+DEFAULT_PLAYERS = 600
+DEFAULT_SEED = 2024
+FIRST_NAMES = ['James', 'Anthony', 'Chris', 'Kevin', 'Jalen', 'Marcus', 'Tyrese', 'Luka', 'Nikola', 'Giannis',
+               'Stephen', 'Devin', 'Jaylen', 'Paolo', 'Scottie', 'Franz', 'Dereck', 'Bogdan', 'Dāvis', 'Jusuf',
+               "De'Aaron", 'Karl-Anthony', 'Shai', 'Victor', 'Zion', 'Trae', 'Cade', 'Evan', 'Jaren', 'Og']
+LAST_NAMES = ['Johnson', 'Williams', 'Brown', 'Jones', 'Davis', 'Miller', 'Wilson', 'Thomas', 'Harris', 'Martin',
+              'Young', 'Allen', 'Green', 'Walker', 'Hall', 'Jokić', 'Dončić', 'Porziņģis', 'Nurkić', 'Bogdanović',
+              'Gilgeous-Alexander', 'Towns', 'Fox', 'Mobley', 'Banchero', 'Barnes', 'Wagner', "O'Neale", 'Lively', 'Reed']
+POSITIONS = ['Guard', 'Forward', 'Center', 'Guard-Forward', 'Forward-Center', 'Forward-Guard', 'Center-Forward']
+
+
+def make_roster(players=DEFAULT_PLAYERS, seed=DEFAULT_SEED, history=False):
+    rng = random.Random(seed)
+    # Season history (all-time data) comes from its own stream, so the rest of
+    # the roster is the same with or without it
+    history_rng = random.Random(seed + 1)
+    teams = sorted(NBA_TEAMS)
+    roster, details, stats = [], {}, {}
+    seen = set()
+    pid = 1_600_000
+    while len(roster) < players:
+        pid += 1
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if name in seen:
+            name = f"{name} {'I' * (1 + sum(n.startswith(name) for n in seen))}"
+        seen.add(name)
+        first, last = name.split(' ', 1)
+        team = rng.choice(teams)
+        roster.append({'id': pid, 'full_name': name, 'first_name': first, 'last_name': last, 'is_active': True})
+        # A few players without details or stats, like failed fetches in the real cache
+        if rng.random() < 0.03:
+            continue
+        details[str(pid)] = {
+            'PERSON_ID': pid, 'DISPLAY_FIRST_LAST': name, 'TEAM_ID': 1610612700 + teams.index(team),
+            'TEAM_ABBREVIATION': team, 'POSITION': rng.choice(POSITIONS),
+            'HEIGHT': f"{rng.randint(6, 7)}-{rng.randint(0, 11)}", 'WEIGHT': str(rng.randint(170, 290)),
+        }
+        if rng.random() < 0.03:
+            continue
+        gp = rng.randint(1, 1200)
+        stats[str(pid)] = {'PLAYER_ID': pid, 'GP': gp, 'PTS': int(gp * rng.uniform(2, 30)),
+                           'REB': int(gp * rng.uniform(1, 13)), 'AST': int(gp * rng.uniform(0.5, 10))}
+        if history:
+            stats[str(pid)]['SEASONS'] = make_seasons(history_rng, teams, team)
+    return roster, details, stats
+
+
+def make_seasons(rng, teams, last_team):
+    # [season, team, GP, PTS, REB, AST] rows spread over 1950-2024, like
+    # fetch_and_cache_players.pick_season_history produces
+    length = rng.randint(1, 15)
+    first = rng.randint(1950, 2025 - length)
+    team = rng.choice(teams)
+    seasons = []
+    for year in range(first, first + length):
+        if year == first + length - 1:
+            team = last_team
+        elif rng.random() < 0.15:
+            team = rng.choice(teams)
+        gp = rng.randint(10, 82)
+        seasons.append([year, team, gp, gp * rng.randint(2, 30), gp * rng.randint(1, 12), gp * rng.randint(0, 9)])
+    return seasons
+
+
+def write_roster(directory, players=DEFAULT_PLAYERS, seed=DEFAULT_SEED, history=False):
+    os.makedirs(directory, exist_ok=True)
+    for name, data in zip(SOURCE_FILES, make_roster(players, seed, history)):
+        with open(os.path.join(directory, name), 'w') as f:
+            json.dump(data, f)
+    return directory
+
+
+def fixture_dir(players=DEFAULT_PLAYERS, seed=DEFAULT_SEED):
+    # Fresh temporary data dir holding the synthetic roster (no player_table.bin)
+    return write_roster(tempfile.mkdtemp(prefix='hoopmind-bench-'), players, seed)
+
+
+def environment():
+    # Recorded with every result so runs from different commits can be lined up
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = 'unknown'
+    return {'commit': commit, 'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the synthetic benchmark roster.")
+    parser.add_argument('directory')
+    parser.add_argument('--players', type=int, default=DEFAULT_PLAYERS)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--history', action='store_true', help="add per-season team history, like --all-time fetches")
+    args = parser.parse_args()
+    write_roster(args.directory, args.players, args.seed, args.history)
+    print(f"Wrote {args.players} synthetic players to {args.directory}", flush=True)
+
+
+if __name__ == '__main__':
+    main()
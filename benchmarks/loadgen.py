@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from fixture import DEFAULT_PLAYERS, DEFAULT_SEED, ROOT, environment, make_roster, write_roster
+
+# Load generator for the web app. Starts gunicorn on the synthetic roster
+# (SQLite game store, so every worker sees every game) and has client threads
+# play full games: rules -> index -> 6 guesses -> reset (or, with --api,
+# /api/game then 6 /api/guess calls). Reports throughput and p50/p99 latency
+# overall and per step.
+#
+#   python benchmarks/loadgen.py --workers 4 --clients 16 --flows 25
+#   python benchmarks/loadgen.py --url http://127.0.0.1:8000   # existing server
+#
+# --server flask runs the threaded development server instead, for machines
+# without gunicorn. Client threads share one interpreter, so keep --clients
+# modest or run several generators side by side when measuring big servers.
+
+GUESSES_PER_FLOW = 6
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(kind, data_dir, port, workers, worker_class):
+    env = dict(os.environ, HOOPMIND_DATA_DIR=data_dir, GAME_STORE='sqlite',
+               GAME_STORE_PATH=os.path.join(data_dir, 'games.sqlite3'), EVENT_LOG_DIR=os.path.join(data_dir, 'logs'),
+               STATS_STORE_PATH=os.path.join(data_dir, 'stats.sqlite3'), HOOPMIND_WORKER_CLASS=worker_class)
+    if kind == 'gunicorn':
+        # The production config (preloaded app factory, gevent patching)
+        cmd = [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'), '-w', str(workers),
+               '-k', worker_class, '-b', f'127.0.0.1:{port}', '--log-level', 'warning']
+    else:
+        cmd = [sys.executable, '-c', f"import app; app.app.run(port={port}, threaded=True)"]
+    log_path = os.path.join(data_dir, 'server.log')
+    with open(log_path, 'wb') as log:
+        proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            with open(log_path, errors='replace') as log:
+                raise SystemExit(f"server exited: {log.read()[-2000:]}")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit("server did not start within 60s")
+
+
+def play_api(base_url, names, flows, seed, record):
+    # Same games through the JSON API: no templates, no session cookie
+    import requests
+    rng = random.Random(seed)
+    http = requests.Session()
+
+    def call(name, path, body):
+        started = time.perf_counter()
+        try:
+            resp = http.post(base_url + path, json=body, timeout=30)
+            ok, data = resp.status_code < 400, resp.json()
+        except (requests.RequestException, ValueError):
+            ok, data = False, {}
+        record(name, time.perf_counter() - started, ok)
+        return data
+
+    for _ in range(flows):
+        token = call('api_game', '/api/game', {}).get('token')
+        for _ in range(GUESSES_PER_FLOW):
+            if not token:
+                break
+            token = call('api_guess', '/api/guess', {'token': token, 'guess': rng.choice(names)}).get('token')
+
+
+def play(base_url, names, flows, seed, record):
+    import requests
+    rng = random.Random(seed)
+    http = requests.Session()
+
+    def step(name, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            status = http.request(method, base_url + path, allow_redirects=False, timeout=30, **kwargs).status_code
+        except requests.RequestException:
+            status = 0
+        record(name, time.perf_counter() - started, 0 < status < 400)
+        return status
+
+    for _ in range(flows):
+        step('rules', 'GET', '/rules')
+        if step('index', 'GET', '/') == 302:
+            # First visit sends the player to the rules once; follow up with the real page
+            step('index', 'GET', '/')
+        for _ in range(GUESSES_PER_FLOW):
+            step('guess', 'POST', '/', data={'guess': rng.choice(names)})
+        step('reset', 'GET', '/reset')
+
+
+def percentile(sorted_samples, q):
+    if not sorted_samples:
+        return 0.0
+    return sorted_samples[min(len(sorted_samples) - 1, int(q * len(sorted_samples)))]
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {'count': len(samples), 'p50_ms': percentile(samples, 0.50) * 1000, 'p99_ms': percentile(samples, 0.99) * 1000}
+
+
+def run(base_url, names, clients, flows, seed, flow=play):
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+
+    def record(name, elapsed, ok):
+        with lock:
+            latencies[name].append(elapsed)
+            if not ok:
+                errors[name] += 1
+
+    threads = [threading.Thread(target=flow, args=(base_url, names, flows, seed + i, record)) for i in range(clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    every = [x for samples in latencies.values() for x in samples]
+    return {
+        'elapsed_s': elapsed,
+        'flows_per_s': clients * flows / elapsed,
+        'requests_per_s': len(every) / elapsed,
+        'errors': sum(errors.values()),
+        'overall': summarize(every),
+        'steps': {name: {**summarize(samples), 'errors': errors[name]} for name, samples in sorted(latencies.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive full game flows against the web app and report latency.")
+    parser.add_argument('--server', choices=('gunicorn', 'flask'), default='gunicorn')
+    parser.add_argument('--url', help="benchmark an already running server instead of starting one")
+    parser.add_argument('--workers', type=int, default=4, help="gunicorn worker processes")
+    parser.add_argument('--worker-class', default='sync', help="gunicorn worker class")
+    parser.add_argument('--clients', type=int, default=8, help="concurrent simulated players")
+    parser.add_argument('--flows', type=int, default=25, help="games per client")
+    parser.add_argument('--players', type=int, default=DEFAULT_PLAYERS)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--api', action='store_true', help="play through /api/game and /api/guess instead of the HTML pages")
+    parser.add_argument('--output', help="write the results as JSON")
+    args = parser.parse_args()
+    flow = play_api if args.api else play
+
+    names = [p['full_name'] for p in make_roster(args.players, args.seed)[0]]
+    data_dir = proc = None
+    base_url = args.url
+    try:
+        if base_url is None:
+            data_dir = write_roster(tempfile.mkdtemp(prefix='hoopmind-load-'), args.players, args.seed)
+            port = free_port()
+            proc = start_server(args.server, data_dir, port, args.workers, args.worker_class)
+            base_url = f'http://127.0.0.1:{port}'
+        # One warm-up game per client so imports and first-request work are not timed
+        run(base_url, names, args.clients, 1, args.seed, flow)
+        result = run(base_url, names, args.clients, args.flows, args.seed, flow)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+        if data_dir is not None:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    result = {'benchmark': 'loadgen', 'server': 'external' if args.url else args.server,
+              'flow': 'api' if args.api else 'html', 'workers': args.workers, 'worker_class': args.worker_class, 'clients': args.clients,
+              'flows': args.flows, 'players': args.players, 'seed': args.seed, **environment(), **result}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
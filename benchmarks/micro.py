@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import time
+
+from fixture import DEFAULT_PLAYERS, DEFAULT_SEED, environment, fixture_dir
+
+# Micro-benchmarks for the web app's hot paths, run against the synthetic
+# roster so they need no network and no cached NBA data.
+#
+#   python benchmarks/micro.py --output before.json
+#   (change something)
+#   python benchmarks/micro.py --compare before.json
+#
+# Every benchmark runs a fixed batch of operations several times and reports
+# microseconds per operation (median and best of the repeats).
+
+
+def measure(fn, batch, repeat):
+    per_op = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        per_op.append((time.perf_counter() - started) / batch * 1e6)
+    return {'median_us': statistics.median(per_op), 'min_us': min(per_op), 'ops': batch}
+
+
+def run(players, seed, repeat):
+    data_dir = fixture_dir(players, seed)
+    os.environ['HOOPMIND_DATA_DIR'] = data_dir
+    from player_table import build_rows, build_table, encode_table, decode_table, load_json_sources, read_table, TABLE_FILE
+    import app
+
+    rng = random.Random(seed)
+    data = app.DATASETS.current()
+    rows = data.target_pool
+    names = [row.full_name for row in data.players]
+    queries = []
+    for name in rng.sample(names, min(200, len(names))):
+        start = rng.randrange(max(1, len(name) - 4))
+        queries.append(name[start:start + rng.randint(2, 5)].lower())
+    typos = []
+    for name in rng.sample(names, min(200, len(names))):
+        i = rng.randrange(len(name))
+        typos.append((name[:i] + name[i + 1:]).lower())
+    pairs = [(rng.choice(rows), rng.choice(rows)) for _ in range(2000)]
+    clue_ids = [rng.choice(rows).id for _ in range(2000)]
+
+    def suggestions():
+        for q in queries:
+            [p.full_name for p in data.name_index.search(q, limit=10)]
+
+    def resolve():
+        for name in names[:200]:
+            data.name_index.best_match(name.lower())
+
+    def resolve_typo():
+        for name in typos:
+            data.name_index.best_match(name)
+
+    def compare():
+        for guessed, target in pairs:
+            app.compare_guess(guessed, target)
+
+    def clue():
+        for pid in clue_ids:
+            app.get_player_clue(pid)
+
+    def load_json():
+        decode_table(encode_table(build_rows(*load_json_sources(data_dir))))
+
+    build_table(data_dir)
+    table_path = os.path.join(data_dir, TABLE_FILE)
+
+    def load_table():
+        read_table(table_path)
+
+    try:
+        results = {
+            'suggestions': measure(suggestions, len(queries), repeat),
+            'resolve_name': measure(resolve, min(200, len(names)), repeat),
+            'resolve_typo': measure(resolve_typo, len(typos), repeat),
+            'compare_guess': measure(compare, len(pairs), repeat),
+            'get_player_clue': measure(clue, len(clue_ids), repeat),
+            'load_json': measure(load_json, 1, max(3, repeat // 4)),
+            'load_table': measure(load_table, 1, max(3, repeat // 4)),
+        }
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return {'benchmark': 'micro', 'players': players, 'seed': seed, 'repeat': repeat, **environment(), 'results': results}
+
+
+def compare_with(baseline, current):
+    print(f"{'benchmark':<18}{'baseline us':>14}{'current us':>14}{'change':>10}")
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        change = result['median_us'] / before['median_us'] - 1
+        print(f"{name:<18}{before['median_us']:>14.2f}{result['median_us']:>14.2f}{change:>+10.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for suggestions, guesses, clues and data load.")
+    parser.add_argument('--players', type=int, default=DEFAULT_PLAYERS)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help="write the results as JSON")
+    parser.add_argument('--compare', help="results JSON from an earlier run to compare against")
+    args = parser.parse_args()
+    result = run(args.players, args.seed, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare_with(json.load(f), result)
+    else:
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
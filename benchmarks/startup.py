@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Cold-start benchmark for the Kivy client.
+#
+#   python benchmarks/startup.py --runs 5       # launches the real window
+#   python benchmarks/startup.py --headless     # data path only, no display
+#
+# The GUI run launches nba_player_guesser_gui.py with HOOPMIND_STARTUP_REPORT
+# set, so the app records time-to-first-frame and time-to-playable and exits.
+# The headless run times what the background roster load does (imports,
+# player table load, name index build, clue table load) in a fresh interpreter.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEADLESS_SNIPPET = """
+import json, time
+t0 = time.perf_counter()
+from nba_player_guesser_gui import load_roster
+t1 = time.perf_counter()
+table, index, clues = load_roster()
+t2 = time.perf_counter()
+print(json.dumps({'import_s': t1 - t0, 'roster_s': t2 - t1, 'players': len(table)}))
+"""
+HEADLESS_DATA_SNIPPET = """
+import json, time
+t0 = time.perf_counter()
+from operator import attrgetter
+from player_table import load_player_table
+from name_index import NameIndex
+from clues import load_clues
+t1 = time.perf_counter()
+table = load_player_table()
+index = NameIndex(table.rows, key=attrgetter('full_name'))
+clues = load_clues()
+t2 = time.perf_counter()
+print(json.dumps({'import_s': t1 - t0, 'roster_s': t2 - t1, 'players': len(table)}))
+"""
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'median': statistics.median(samples),
+        'min': samples[0],
+        'max': samples[-1],
+    }
+
+
+def run_gui(runs, timeout):
+    first_frame, playable, wall = [], [], []
+    for _ in range(runs):
+        fd, report = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        os.remove(report)
+        env = dict(os.environ, HOOPMIND_STARTUP_REPORT=report, HOOPMIND_STARTUP_EXIT='1')
+        started = time.time()
+        subprocess.run([sys.executable, 'nba_player_guesser_gui.py'], cwd=ROOT, env=env, timeout=timeout,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        if not os.path.exists(report):
+            raise SystemExit("GUI exited without writing a startup report")
+        with open(report) as f:
+            data = json.load(f)
+        os.remove(report)
+        first_frame.append(data['first_frame_s'])
+        playable.append(data['playable_s'])
+        wall.append(data['finished_at'] - started)
+    return {'first_frame_s': summarize(first_frame), 'playable_s': summarize(playable), 'process_wall_s': summarize(wall)}
+
+
+def run_headless(runs, timeout):
+    # Without kivy installed, fall back to timing the data modules directly
+    try:
+        import kivy  # noqa: F401
+        snippet = HEADLESS_SNIPPET
+    except ImportError:
+        snippet = HEADLESS_DATA_SNIPPET
+    imports, rosters = [], []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', snippet], cwd=ROOT, timeout=timeout, capture_output=True, text=True, check=True)
+        data = json.loads(out.stdout.strip().splitlines()[-1])
+        imports.append(data['import_s'])
+        rosters.append(data['roster_s'])
+    return {'import_s': summarize(imports), 'roster_s': summarize(rosters), 'players': data['players']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure HoopMind desktop client cold start.")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--headless', action='store_true', help="time the roster load without opening a window")
+    args = parser.parse_args()
+    result = run_headless(args.runs, args.timeout) if args.headless else run_gui(args.runs, args.timeout)
+    result.update({'benchmark': 'startup-headless' if args.headless else 'startup', 'runs': args.runs})
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import json
+import os
+import threading
+import time
+
+
+class CacheJournal:
+    # Append-only JSONL log of fetched players. Each line is flushed and fsynced
+    # as soon as a player comes back, so a crashed run resumes where it stopped.
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self._file = None
+
+    def append(self, pid, details, stats):
+        line = json.dumps({'id': str(pid), 'ts': time.time(), 'details': details, 'stats': stats}, separators=(',', ':'))
+        with self.lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def replay(self, player_details, player_stats):
+        # Applies journal entries on top of the given dicts, later lines win.
+        # A torn last line from a crash is ignored.
+        if not os.path.exists(self.path):
+            return 0
+        count = 0
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                player_details[entry['id']] = entry['details']
+                player_stats[entry['id']] = entry['stats']
+                count += 1
+        return count
+
+    def compact(self, details_path, stats_path, player_details, player_stats):
+        # Writes the merged artifacts atomically, then starts a fresh journal
+        self.close()
+        _write_json_atomic(details_path, player_details)
+        _write_json_atomic(stats_path, player_stats)
+        with self.lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def _write_json_atomic(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
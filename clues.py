@@ -0,0 +1,189 @@
+import json
+import os
+import struct
+
+from player_table import DATA_DIR, SOURCE_FILES, load_json_sources, per_game
+
+# Clue ladders, built with the player table and written next to it as
+# player_clues.bin. Every player gets up to LEVELS clues, vaguest first:
+#
+#   0  career per-game averages
+#   1  draft year, round and pick
+#   2  college and country
+#   3  best season (all-time data) or career span
+#   4  teams played for (all-time data) or jersey number
+#
+# Tiers the cache has no data for are left out. A game at reveal level n shows
+# the first n + 1; serving them is one dict lookup and a slice.
+
+CLUES_FILE = 'player_clues.bin'
+LEVELS = 5
+
+MAGIC = b'HMCL'
+VERSION = 1
+HEADER = struct.Struct('<4sHHII')  # magic, version, levels, record count, string table bytes
+RECORD = struct.Struct(f'<i{LEVELS}I')  # player id, string table index per level (0 = no clue)
+
+
+def averages_clue(stats):
+    if not stats:
+        return "No stats available."
+    ppg, rpg, apg = per_game(stats)
+    return f"Career averages - PPG: {ppg:.1f}, RPG: {rpg:.1f}, APG: {apg:.1f}"
+
+
+def draft_clue(info):
+    year, rnd, pick = (str(info.get(key) or '') for key in ('DRAFT_YEAR', 'DRAFT_ROUND', 'DRAFT_NUMBER'))
+    if not year.isdigit():
+        return "Undrafted"
+    if rnd.isdigit() and pick.isdigit():
+        return f"Drafted {year}, round {rnd}, pick {pick}"
+    return f"Drafted {year}"
+
+
+def background_clue(info):
+    school = (info.get('SCHOOL') or '').strip()
+    country = (info.get('COUNTRY') or '').strip()
+    if school and country:
+        return f"College: {school} · Country: {country}"
+    if country:
+        return f"Country: {country}"
+    return f"College: {school}" if school else ''
+
+
+def season_totals(seasons):
+    # {season: [teams, gp, pts, reb, ast]}, one entry per season even for
+    # players traded mid-season
+    totals = {}
+    for season, team, gp, pts, reb, ast in seasons:
+        entry = totals.setdefault(season, [[], 0, 0, 0, 0])
+        if team not in entry[0]:
+            entry[0].append(team)
+        entry[1] += gp
+        entry[2] += pts
+        entry[3] += reb
+        entry[4] += ast
+    return totals
+
+
+def best_season_clue(seasons, info):
+    totals = season_totals(seasons)
+    played = {season: t for season, t in totals.items() if t[1]}
+    if played:
+        season, (teams, gp, pts, reb, ast) = max(played.items(), key=lambda item: (item[1][2] / item[1][1], item[0]))
+        return (f"Best season: {season}-{(season + 1) % 100:02d} ({'/'.join(teams)}) - "
+                f"PPG: {pts / gp:.1f}, RPG: {reb / gp:.1f}, APG: {ast / gp:.1f}")
+    first, last = info.get('FROM_YEAR'), info.get('TO_YEAR')
+    if not first or not last:
+        return ''
+    count = info.get('SEASON_EXP')
+    length = f" ({count} seasons)" if count else ''
+    return f"In the league {first}-{last}{length}" if first != last else f"Rookie season: {first}"
+
+
+def teams_clue(seasons, info):
+    teams = []
+    for _, team, *_ in sorted(seasons, key=lambda s: s[0]):
+        if team and team not in teams:
+            teams.append(team)
+    if teams:
+        return f"Played for: {', '.join(teams)}"
+    jersey = str(info.get('JERSEY') or '').strip()
+    return f"Wears #{jersey}" if jersey else ''
+
+
+def build_ladders(players, details, stats):
+    # {player id: (clue, ...)} for every player with details
+    ladders = {}
+    for p in players:
+        pid = str(p['id'])
+        info = details.get(pid)
+        if not info:
+            continue
+        career = stats.get(pid) or {}
+        seasons = career.get('SEASONS') or []
+        clues = (averages_clue(career), draft_clue(info), background_clue(info),
+                 best_season_clue(seasons, info), teams_clue(seasons, info))
+        ladders[int(p['id'])] = tuple(clue for clue in clues if clue)
+    return ladders
+
+
+class ClueTable:
+    def __init__(self, ladders):
+        self.ladders = ladders
+
+    def __len__(self):
+        return len(self.ladders)
+
+    def get(self, player_id):
+        try:
+            return self.ladders.get(int(player_id), ())
+        except (TypeError, ValueError):
+            return ()
+
+    def reveal(self, player_id, count):
+        return self.get(player_id)[:max(count, 0)]
+
+
+def encode_clues(ladders):
+    strings = ['']
+    string_ids = {'': 0}
+    records = bytearray()
+    for pid, clues in ladders.items():
+        slots = [0] * LEVELS
+        for level, clue in enumerate(clues[:LEVELS]):
+            if clue not in string_ids:
+                string_ids[clue] = len(strings)
+                strings.append(clue)
+            slots[level] = string_ids[clue]
+        records += RECORD.pack(pid, *slots)
+    string_blob = json.dumps(strings, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return HEADER.pack(MAGIC, VERSION, LEVELS, len(ladders), len(string_blob)) + string_blob + bytes(records)
+
+
+def decode_clues(buf):
+    magic, version, levels, count, string_len = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION or levels != LEVELS:
+        raise ValueError(f"not a version {VERSION} clue table")
+    strings = json.loads(bytes(buf[HEADER.size:HEADER.size + string_len]).decode('utf-8'))
+    start = HEADER.size + string_len
+    ladders = {}
+    for pid, *slots in RECORD.iter_unpack(buf[start:start + count * RECORD.size]):
+        ladders[pid] = tuple(strings[slot] for slot in slots if slot)
+    return ClueTable(ladders)
+
+
+def write_clues(path, ladders):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(encode_clues(ladders))
+    os.replace(tmp, path)
+
+
+def read_clues(path):
+    with open(path, 'rb') as f:
+        return decode_clues(f.read())
+
+
+def is_stale(data_dir=DATA_DIR):
+    path = os.path.join(data_dir, CLUES_FILE)
+    if not os.path.exists(path):
+        return True
+    built = os.path.getmtime(path)
+    return any(os.path.getmtime(os.path.join(data_dir, name)) > built for name in SOURCE_FILES)
+
+
+def build_clues(data_dir=DATA_DIR, sources=None):
+    ladders = build_ladders(*(sources or load_json_sources(data_dir)))
+    write_clues(os.path.join(data_dir, CLUES_FILE), ladders)
+    return ladders
+
+
+def load_clues(data_dir=DATA_DIR):
+    # Prebuilt ladders, or built in memory when the file is missing or stale
+    if not is_stale(data_dir):
+        try:
+            return read_clues(os.path.join(data_dir, CLUES_FILE))
+        except (OSError, ValueError):
+            pass
+    return ClueTable(build_ladders(*load_json_sources(data_dir)))
@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import random
+import threading
+from collections import namedtuple
+from datetime import date, timedelta
+
+from player_table import HAS_DETAILS, HAS_STATS, DATA_DIR, load_player_table
+
+# Deterministic daily puzzle schedule. The target for every date is decided
+# ahead of time: eligible players are split into difficulty tiers (from the
+# solver's expected guesses), each tier is shuffled with a fixed seed, and the
+# week follows a fixed easy-to-hard pattern.
+
+EPOCH = date(2025, 1, 1)
+SCHEDULE_FILE = 'daily_schedule.json'
+DEFAULT_DAYS = 730
+DEFAULT_SEED = 'hoopmind'
+TIERS = ('easy', 'medium', 'hard')
+WEEK_PATTERN = (0, 0, 1, 1, 1, 2, 2)  # Monday .. Sunday
+
+DailyPuzzle = namedtuple('DailyPuzzle', ['date', 'number', 'target', 'clue', 'tier'])
+
+
+def eligible_players(table):
+    # Players with missing details or stats (failed fetches) never get scheduled
+    need = HAS_DETAILS | HAS_STATS
+    return [row for row in table if row.flags & need == need]
+
+
+def split_tiers(player_ids, difficulty):
+    ranked = sorted(player_ids, key=lambda pid: (difficulty.get(pid, 0), pid))
+    size = len(ranked)
+    return [ranked[size * i // len(TIERS):size * (i + 1) // len(TIERS)] for i in range(len(TIERS))]
+
+
+def build_order(player_ids, difficulty, seed=DEFAULT_SEED, days=DEFAULT_DAYS):
+    rng = random.Random(seed)
+    tiers = split_tiers(player_ids, difficulty)
+    queues = [[] for _ in tiers]
+    order = []
+    tier_of_day = []
+    for n in range(days):
+        tier = WEEK_PATTERN[(EPOCH + timedelta(days=n)).weekday()]
+        if not tiers[tier]:
+            tier = max(range(len(tiers)), key=lambda i: len(tiers[i]))
+        if not queues[tier]:
+            queues[tier] = tiers[tier][:]
+            rng.shuffle(queues[tier])
+        order.append(queues[tier].pop())
+        tier_of_day.append(tier)
+    return order, tier_of_day
+
+
+def schedule_difficulty(table):
+    # Expected guesses per eligible player, scored over the eligible pool.
+    # Both the CLI and in-app builds use this, so they tier players alike.
+    from solver import Solver
+    ids = [row.id for row in eligible_players(table)]
+    return Solver(table, ids).difficulty() if ids else {}
+
+
+def build_schedule(table, seed=DEFAULT_SEED, days=DEFAULT_DAYS, difficulty=None):
+    ids = [row.id for row in eligible_players(table)]
+    difficulty = schedule_difficulty(table) if difficulty is None else difficulty
+    order, tiers = build_order(ids, difficulty, seed, days)
+    return {'epoch': EPOCH.isoformat(), 'seed': seed, 'order': order, 'tiers': tiers}
+
+
+def repair_schedule(schedule, table, difficulty=None):
+    # Replaces only the scheduled players who are no longer eligible; every
+    # other day keeps its target. A replacement comes from the same tier and
+    # is picked with a seed of its own slot, so every worker picks the same one.
+    ids = [row.id for row in eligible_players(table)]
+    eligible = set(ids)
+    order = list(schedule['order'])
+    stale = [n for n, pid in enumerate(order) if pid not in eligible]
+    if not stale or not ids:
+        return schedule
+    tiers = split_tiers(ids, schedule_difficulty(table) if difficulty is None else difficulty)
+    used = set(order)
+    for n in stale:
+        tier = tiers[schedule['tiers'][n]]
+        candidates = [pid for pid in tier if pid not in used] or tier or ids
+        order[n] = random.Random(f"{schedule['seed']}:{n}").choice(candidates)
+        used.add(order[n])
+    return {**schedule, 'order': order}
+
+
+def write_schedule(path, schedule):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(schedule, f)
+    os.replace(tmp, path)
+
+
+class DailySchedule:
+    def __init__(self, table, schedule, clue):
+        self.table = table
+        self.epoch = date.fromisoformat(schedule['epoch'])
+        self.order = schedule['order']
+        self.tiers = schedule['tiers']
+        self.clue = clue
+        self._lock = threading.Lock()
+        self._puzzles = {}
+
+    def puzzle_for(self, day):
+        # One cached puzzle object (target row and rendered clue) per date
+        puzzle = self._puzzles.get(day)
+        if puzzle is not None:
+            return puzzle
+        number = (day - self.epoch).days
+        slot = number % len(self.order)
+        target = self.table.get(self.order[slot])
+        puzzle = DailyPuzzle(day.isoformat(), number + 1, target, self.clue(target.id), TIERS[self.tiers[slot]])
+        with self._lock:
+            if len(self._puzzles) > 8:
+                self._puzzles.clear()
+            self._puzzles[day] = puzzle
+        return puzzle
+
+    def today(self):
+        return self.puzzle_for(date.today())
+
+
+def load_schedule(table, clue, data_dir=DATA_DIR, seed=None):
+    # Uses the prebuilt schedule file, with any players who have since become
+    # ineligible swapped out (see repair_schedule). It is only rebuilt from
+    # scratch when there is no usable file for this seed.
+    seed = seed or os.environ.get('DAILY_SEED', DEFAULT_SEED)
+    path = os.path.join(data_dir, SCHEDULE_FILE)
+    try:
+        with open(path) as f:
+            schedule = json.load(f)
+        if schedule.get('seed') == seed and schedule['order'] and len(schedule['tiers']) == len(schedule['order']):
+            return DailySchedule(table, repair_schedule(schedule, table), clue)
+    except (OSError, ValueError, KeyError):
+        pass
+    return DailySchedule(table, build_schedule(table, seed), clue)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the daily puzzle schedule.")
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS)
+    parser.add_argument('--seed', default=os.environ.get('DAILY_SEED', DEFAULT_SEED))
+    args = parser.parse_args()
+    table = load_player_table()
+    schedule = build_schedule(table, args.seed, args.days)
+    write_schedule(os.path.join(DATA_DIR, SCHEDULE_FILE), schedule)
+    print(f"Wrote {len(schedule['order'])} days to {SCHEDULE_FILE}", flush=True)
+
+
+if __name__ == '__main__':
+    main()
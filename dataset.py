@@ -0,0 +1,266 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from operator import attrgetter
+
+import metrics
+import offload
+from clues import CLUES_FILE, load_clues
+from daily import load_schedule, SCHEDULE_FILE
+from history_store import HISTORY_FILE, open_history, parse_era
+from name_index import NameIndex, normalize_name
+from player_table import DATA_DIR, HAS_DETAILS, SOURCE_FILES, TABLE_FILE, load_player_table
+from solver import Solver
+
+# Versioned player data for the web app. A Dataset bundles everything derived
+# from one snapshot of the cache files (table, clue ladders, target pool,
+# name index, solver, daily schedule). DatasetHolder serves the current one and reloads
+# in the background when the files change; the swap is a single reference
+# assignment, and recent versions stay available so games keep using the
+# snapshot they started on.
+#
+# There is no watcher thread: current() stats the files at most once per
+# interval, on the request path. That keeps it working under gunicorn
+# --preload, where threads started in the master do not survive the fork.
+
+WATCHED_FILES = SOURCE_FILES + (TABLE_FILE, CLUES_FILE, SCHEDULE_FILE, HISTORY_FILE)
+RELOAD_INTERVAL = float(os.environ.get('HOOPMIND_RELOAD_INTERVAL', 30))
+KEEP_VERSIONS = 4
+# get() with a version this worker does not hold checks the files early, but
+# at most this often: the version comes from tokens and URLs clients control
+UNKNOWN_VERSION_CHECK_INTERVAL = 2.0
+MIN_SIZE_RATIO = 0.5  # reject a reload that loses more than half the players
+SUGGESTION_LIMIT = 10
+# A solver holds its partition table, pool size squared uint16, plus a few MB
+# of scratch while scoring (see solver.py), so hints are only offered for
+# pools up to this size: 3000 players is about 18 MB. Each dataset version
+# keeps its full-pool solver; era solvers are shared by every version in one
+# LRU of ERA_SOLVERS. A worker holds at most KEEP_VERSIONS + ERA_SOLVERS
+# solvers, about 110 MB at the cap; real pools are far smaller.
+SOLVER_MAX_POOL = int(os.environ.get('SOLVER_MAX_POOL', 3000))
+ERA_SOLVERS = 2
+
+_solver_lock = threading.Lock()
+_era_solvers = OrderedDict()  # (version, era span) -> Solver or None
+# Era spans come from ?era=, so any number of distinct ones can be asked
+# for; filtered pools are kept in one LRU shared by every version
+ERA_POOLS = 16
+_pool_lock = threading.Lock()
+_era_pools = OrderedDict()  # (version, era span) -> target rows
+
+
+def data_signature(data_dir=DATA_DIR):
+    # Same files, sizes and mtimes -> same signature in every worker
+    parts = []
+    for name in WATCHED_FILES:
+        try:
+            st = os.stat(os.path.join(data_dir, name))
+        except OSError:
+            continue
+        parts.append(f"{name}:{st.st_size}:{st.st_mtime_ns}")
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()[:12]
+
+
+class Dataset:
+    def __init__(self, version, table, data_dir=DATA_DIR):
+        self.version = version
+        self.data_dir = data_dir
+        self.table = table
+        self.players = table.rows
+        self.target_pool = [row for row in self.players if row.flags & HAS_DETAILS]
+        with metrics.load_stage('clues'):
+            self.clue_table = load_clues(data_dir)
+        with metrics.load_stage('name_index'):
+            self.name_index = NameIndex(self.players, key=attrgetter('full_name'))
+        # Ready-to-send /player_suggestions bodies for every 2-3 character query
+        with metrics.load_stage('suggestion_shards'):
+            self.suggestion_shards = {query: self._names_json(positions)
+                                      for query, positions in self.name_index.precompute(limit=SUGGESTION_LIMIT).items()}
+        # Season-by-season history (all-time data only), read from SQLite on demand
+        self.history = open_history(data_dir)
+        self._solvers = {}
+        self._daily = None
+        self._daily_lock = threading.Lock()
+        self._client_index = None
+        # Built up front so gunicorn --preload workers share it
+        self.solver_for(None)
+
+    def player_info(self, player_id):
+        row = self.table.get(player_id)
+        return row if row and row.flags & HAS_DETAILS else None
+
+    def clue(self, player_id):
+        # First rung of the ladder, shown before any guess
+        return self.clues(player_id, 0)[0]
+
+    def clues(self, player_id, reveal_level):
+        # Clues unlocked at this reveal level, vaguest first
+        return self.clue_table.reveal(player_id, reveal_level + 1) or ("No stats available.",)
+
+    def era_range(self, era):
+        # (first, last) season for a known era, or None for the full pool
+        return parse_era(era) if self.history is not None else None
+
+    def pool(self, era=None):
+        # Target rows, optionally only players who played in the era
+        span = self.era_range(era)
+        if span is None:
+            return self.target_pool
+        key = (self.version, span)
+        with _pool_lock:
+            rows = _era_pools.get(key)
+            if rows is not None:
+                _era_pools.move_to_end(key)
+                return rows
+        ids = self.history.era_ids(*span)
+        rows = [row for row in self.target_pool if row.id in ids]
+        with _pool_lock:
+            _era_pools[key] = rows
+            while len(_era_pools) > ERA_POOLS:
+                _era_pools.popitem(last=False)
+        return rows
+
+    @property
+    def solver(self):
+        return self.solver_for(None)
+
+    def solver_for(self, era=None):
+        # Partition tables for /hint over the same pool targets are drawn
+        # from, built on first use; None when the pool is too large
+        span = self.era_range(era)
+        cache = self._solvers if span is None else _era_solvers
+        key = (self.version, span)
+        with _solver_lock:
+            if key in cache:
+                if span is not None:
+                    cache.move_to_end(key)
+                return cache[key]
+            pool = self.pool(era)
+            if not pool or len(pool) > SOLVER_MAX_POOL:
+                solver = None
+            else:
+                with metrics.load_stage('solver'):
+                    solver = Solver(self.table, [row.id for row in pool])
+            cache[key] = solver
+            while len(_era_solvers) > ERA_SOLVERS:
+                _era_solvers.popitem(last=False)
+            return solver
+
+    def _names_json(self, positions):
+        return json.dumps([self.players[pos].full_name for pos in positions], separators=(',', ':')).encode()
+
+    def suggestions_json(self, query):
+        shard = self.suggestion_shards.get(normalize_name(query))
+        if shard is not None:
+            return shard
+        return self._names_json(self.name_index.search_positions(query, SUGGESTION_LIMIT))
+
+    def client_index(self):
+        # Gzipped name list for pages that match suggestions locally
+        if self._client_index is None:
+            names = [row.full_name for row in self.players]
+            body = json.dumps({'version': self.version, 'names': names}, ensure_ascii=False, separators=(',', ':'))
+            self._client_index = gzip.compress(body.encode(), mtime=0)
+        return self._client_index
+
+    def daily_schedule(self):
+        # Built before the dataset is served (create_app, DatasetHolder._reload),
+        # then shared by every request
+        if self._daily is None:
+            with self._daily_lock:
+                if self._daily is None:
+                    self._daily = load_schedule(self.table, self.clue, self.data_dir)
+        return self._daily
+
+
+def load_dataset(data_dir=DATA_DIR, version=None):
+    version = version or data_signature(data_dir)
+    with metrics.load_stage('player_table'):
+        table = load_player_table(data_dir)
+    return Dataset(version, table, data_dir)
+
+
+def validate(dataset, previous=None):
+    if not dataset.target_pool:
+        raise ValueError("no players with details")
+    if previous is not None and len(dataset.players) < len(previous.players) * MIN_SIZE_RATIO:
+        raise ValueError(f"player count dropped from {len(previous.players)} to {len(dataset.players)}")
+
+
+class DatasetHolder:
+    def __init__(self, data_dir=DATA_DIR, interval=RELOAD_INTERVAL, loader=load_dataset):
+        self.data_dir = data_dir
+        self.interval = interval
+        self.loader = loader
+        self._current = loader(data_dir)
+        validate(self._current)
+        self._versions = {self._current.version: self._current}
+        self._lock = threading.Lock()
+        self._loading = False
+        self._rejected = None
+        self._checked = time.monotonic()
+        self.last_error = None
+
+    def current(self):
+        if self.interval > 0 and time.monotonic() - self._checked >= self.interval:
+            self.check()
+        return self._current
+
+    def get(self, version):
+        # The dataset a game started on. A version this worker does not hold
+        # has aged out, or was loaded by another worker first (each reloads
+        # on its own timer): check the files now rather than at the next
+        # interval (throttled, since clients choose the version), and serve
+        # the current one meanwhile. Callers must expect its player_info()
+        # to miss the game's target.
+        dataset = self._versions.get(version)
+        if dataset is None:
+            if time.monotonic() - self._checked >= UNKNOWN_VERSION_CHECK_INTERVAL:
+                self.check()
+            dataset = self._current
+        return dataset
+
+    def check(self):
+        # Starts a background reload if the files on disk changed
+        self._checked = time.monotonic()
+        version = data_signature(self.data_dir)
+        with self._lock:
+            if self._loading or version in (self._current.version, self._rejected):
+                return False
+            self._loading = True
+        # On a real thread from the blocking pool: under gevent a
+        # threading.Thread is a greenlet, and the rebuild would stall the
+        # worker's event loop
+        if not offload.submit(self._reload, version):
+            with self._lock:
+                self._loading = False
+            return False
+        return True
+
+    def _reload(self, version):
+        try:
+            dataset = self.loader(self.data_dir, version)
+            validate(dataset, self._current)
+            # Loaded, repaired or rebuilt here, off the request path, so the
+            # first /daily after the swap does not run the difficulty solve
+            with metrics.load_stage('daily_schedule'):
+                dataset.daily_schedule()
+        except Exception as e:
+            # Keep serving the old version; the same files are not retried
+            self.last_error = f"{version}: {e}"
+            with self._lock:
+                self._rejected = version
+                self._loading = False
+            print(f"Rejected player data {version}: {e}", flush=True)
+            return
+        with self._lock:
+            self._versions[version] = dataset
+            while len(self._versions) > KEEP_VERSIONS:
+                self._versions.pop(next(iter(self._versions)))
+            self._current = dataset
+            self._loading = False
+        print(f"Loaded player data {version} ({len(dataset.players)} players)", flush=True)
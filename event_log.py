@@ -0,0 +1,187 @@
+import argparse
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+
+import metrics
+import offload
+
+# Gameplay event log. emit() only puts the event on a bounded queue; a
+# background thread writes batches of JSON lines when the batch is full or the
+# flush interval passes. Each process writes its own file
+# (events-<pid>.jsonl) and rotates it to events-<pid>-<time_ns>.jsonl past
+# max_bytes, so gunicorn workers never share a file handle. If the queue is
+# full the event is dropped and counted (hoopmind_events_dropped on /metrics)
+# rather than blocking the request.
+# Writes go through offload.run, so under gevent they happen on a real thread.
+#
+#   python event_log.py --dir logs      # solve rates from every log file
+
+LOG_DIR = os.environ.get('EVENT_LOG_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs'))
+ENABLED = os.environ.get('EVENT_LOG', '1') == '1'
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 1.0
+MAX_BYTES = 8 * 1024 * 1024
+QUEUE_SIZE = 10000
+
+
+class EventLog:
+    def __init__(self, directory=LOG_DIR, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 max_bytes=MAX_BYTES, queue_size=QUEUE_SIZE):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+    def _start(self):
+        # Per process: under gunicorn --preload the master's thread and queue
+        # do not carry over into forked workers
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(self.queue_size)
+            self._thread = threading.Thread(target=self._run, name='hoopmind-events', daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+            atexit.register(self.close)
+            metrics.EVENTS_DROPPED.set(self.dropped)
+
+    def emit(self, event_type, **fields):
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait({'ts': round(time.time(), 3), 'type': event_type, **fields})
+        except queue.Full:
+            self.dropped += 1
+            metrics.EVENTS_DROPPED.set(self.dropped)
+
+    def path(self):
+        return os.path.join(self.directory, f"events-{os.getpid()}.jsonl")
+
+    def _run(self):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path()
+        f = open(path, 'a', encoding='utf-8')
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                event = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                event = False
+            if event is None:
+                break
+            if event:
+                batch.append(json.dumps(event, separators=(',', ':')))
+            if len(batch) >= self.batch_size or (batch and time.monotonic() >= deadline):
+                f = offload.run(self._write, f, path, batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+        if batch:
+            f.write('\n'.join(batch) + '\n')
+        f.close()
+
+    def _write(self, f, path, batch):
+        # Appends a batch; returns the file to keep writing to after rotation
+        f.write('\n'.join(batch) + '\n')
+        f.flush()
+        if f.tell() >= self.max_bytes:
+            f.close()
+            os.replace(path, os.path.join(self.directory, f"events-{os.getpid()}-{time.time_ns()}.jsonl"))
+            f = open(path, 'a', encoding='utf-8')
+        return f
+
+    def close(self):
+        # Flushes what is queued; called at exit
+        if self._pid != os.getpid() or self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._pid = None
+
+
+class NullEventLog:
+    dropped = 0
+
+    def emit(self, event_type, **fields):
+        pass
+
+    def close(self):
+        pass
+
+
+def create_event_log():
+    return EventLog() if ENABLED else NullEventLog()
+
+
+def read_events(directory=LOG_DIR):
+    # Streams events from every log file, oldest file first; skips torn lines
+    for path in sorted(glob.glob(os.path.join(directory, 'events-*.jsonl')), key=os.path.getmtime):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def aggregate(events):
+    # Per target player: games finished, games solved, solve rate and the
+    # average number of guesses it took when solved
+    games = defaultdict(int)
+    solved = defaultdict(int)
+    solve_guesses = defaultdict(int)
+    for event in events:
+        if event.get('type') not in ('win', 'loss'):
+            continue
+        target = event['target']
+        games[target] += 1
+        if event['type'] == 'win':
+            solved[target] += 1
+            solve_guesses[target] += event['attempt']
+    return {
+        target: {
+            'games': games[target],
+            'solved': solved[target],
+            'solve_rate': solved[target] / games[target],
+            'avg_guesses': solve_guesses[target] / solved[target] if solved[target] else None,
+        }
+        for target in games
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-player solve rates from the gameplay event logs.")
+    parser.add_argument('--dir', default=LOG_DIR)
+    parser.add_argument('--output', help="write the stats as JSON instead of printing a table")
+    args = parser.parse_args()
+    stats = aggregate(read_events(args.dir))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({str(target): row for target, row in stats.items()}, f, indent=2)
+        print(f"Wrote stats for {len(stats)} players to {args.output}", flush=True)
+        return
+    from player_table import load_player_table
+    table = load_player_table()
+    print(f"{'player':<28}{'games':>7}{'solved':>8}{'rate':>7}{'avg guesses':>13}")
+    for target, row in sorted(stats.items(), key=lambda item: (-item[1]['games'], item[0])):
+        player = table.get(target)
+        name = player.full_name if player else str(target)
+        avg = f"{row['avg_guesses']:.2f}" if row['avg_guesses'] is not None else '-'
+        print(f"{name:<28}{row['games']:>7}{row['solved']:>8}{row['solve_rate']:>7.0%}{avg:>13}")
+
+
+if __name__ == '__main__':
+    main()
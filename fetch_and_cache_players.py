@@ -1,55 +1,268 @@
-from nba_api.stats.static import players
-from nba_api.stats.endpoints import commonplayerinfo, playercareerstats
+import argparse
 import json
-import time
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from cache_journal import CacheJournal
+from player_table import build_table
+
+# stats.nba.com starts refusing connections well before one request a second
+# per client, so every endpoint call goes through one shared token bucket.
+DEFAULT_RATE = 1.5
+DEFAULT_BURST = 3
+DEFAULT_WORKERS = 4
+DEFAULT_RETRIES = 4
+DEFAULT_PASSES = 2
+REQUEST_TIMEOUT = 30
+JOURNAL_PATH = 'player_cache.journal.jsonl'
+ALL_TIME_DIR = 'alltime'
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def default_endpoints():
+    from nba_api.stats.endpoints import commonplayerinfo, playercareerstats
+    return commonplayerinfo.CommonPlayerInfo, playercareerstats.PlayerCareerStats
+
+
+class StubEndpoint:
+    # Local stand-in for an nba_api endpoint class: called with player_id and
+    # timeout, returns an object with get_normalized_dict(). The first
+    # fail_first calls for each player raise, like a throttled connection.
+    def __init__(self, responses, fail_first=0):
+        self.responses = responses
+        self.fail_first = fail_first
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, player_id, timeout=None):
+        pid = str(player_id)
+        with self.lock:
+            self.calls[pid] = self.calls.get(pid, 0) + 1
+            attempt = self.calls[pid]
+        if attempt <= self.fail_first or pid not in self.responses:
+            raise ConnectionError(f"stub endpoint refused player {pid}")
+        return StubResponse(self.responses[pid])
+
+
+class StubResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def get_normalized_dict(self):
+        return self.data
+
+
+def stub_endpoints(player_details, player_stats, fail_first=0):
+    # (info, stats) stand-ins answering from cached details and stats in the
+    # shape the live endpoints use, so fetch_players() runs without network
+    info = {pid: {'CommonPlayerInfo': [details]} for pid, details in player_details.items() if details}
+    stats = {}
+    for pid in info:
+        career = dict(player_stats.get(pid) or {})
+        seasons = [{'SEASON_ID': f"{season}-{(season + 1) % 100:02d}", 'TEAM_ABBREVIATION': team,
+                    'GP': gp, 'PTS': pts, 'REB': reb, 'AST': ast}
+                   for season, team, gp, pts, reb, ast in career.pop('SEASONS', None) or []]
+        stats[pid] = {'CareerTotalsRegularSeason': [career] if career else [], 'SeasonTotalsRegularSeason': seasons}
+    return StubEndpoint(info, fail_first), StubEndpoint(stats, fail_first)
+
+
+def pick_career_stats(stats):
+    if 'CareerStats' in stats and stats['CareerStats']:
+        return stats['CareerStats'][0]
+    if 'CareerTotalsRegularSeason' in stats and stats['CareerTotalsRegularSeason']:
+        return stats['CareerTotalsRegularSeason'][0]
+    return {}
+
+
+def pick_season_history(stats):
+    # Compact per-season rows from SeasonTotalsRegularSeason:
+    # [season start year, team, GP, PTS, REB, AST]. Traded players have one row
+    # per team plus a 'TOT' row, which is dropped.
+    history = []
+    for row in stats.get('SeasonTotalsRegularSeason') or []:
+        team = row.get('TEAM_ABBREVIATION') or ''
+        season = str(row.get('SEASON_ID') or '')
+        if team == 'TOT' or not season[:4].isdigit():
+            continue
+        history.append([int(season[:4]), team, row.get('GP') or 0, row.get('PTS') or 0, row.get('REB') or 0, row.get('AST') or 0])
+    return history
+
+
+def fetch_player(pid, limiter, endpoints):
+    info_endpoint, stats_endpoint = endpoints
+    limiter.acquire()
+    info = info_endpoint(player_id=pid, timeout=REQUEST_TIMEOUT).get_normalized_dict()
+    if not info.get('CommonPlayerInfo'):
+        raise ValueError('empty CommonPlayerInfo')
+    limiter.acquire()
+    stats = stats_endpoint(player_id=pid, timeout=REQUEST_TIMEOUT).get_normalized_dict()
+    career = dict(pick_career_stats(stats))
+    if career:
+        career['SEASONS'] = pick_season_history(stats)
+    return info['CommonPlayerInfo'][0], career
+
+
+def fetch_with_backoff(pid, limiter, endpoints, retries, base_delay):
+    for attempt in range(retries + 1):
+        try:
+            return fetch_player(pid, limiter, endpoints)
+        except Exception:
+            if attempt == retries:
+                raise
+            # Exponential backoff with jitter so workers don't retry in lockstep
+            time.sleep(base_delay * (2 ** attempt) * (0.5 + random.random()))
+
+
+def fetch_players(players_to_fetch, endpoints=None, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                  retries=DEFAULT_RETRIES, passes=DEFAULT_PASSES, base_delay=2.0, on_result=None):
+    # Returns ({pid: (details, stats)}, {pid: error}). Players that still fail
+    # after every pass are reported, never cached as empty entries.
+    endpoints = endpoints or default_endpoints()
+    limiter = TokenBucket(rate, burst)
+    results = {}
+    pending = {str(p['id']): p for p in players_to_fetch}
+    errors = {}
+    for n in range(passes):
+        if not pending:
+            break
+        if n:
+            print(f"Retrying {len(pending)} failed players (pass {n + 1}/{passes})...", flush=True)
+            time.sleep(base_delay * (2 ** retries))
+        errors = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(fetch_with_backoff, pid, limiter, endpoints, retries, base_delay): pid for pid in pending}
+            for future in as_completed(futures):
+                pid = futures[future]
+                name = pending[pid].get('full_name', pid)
+                try:
+                    results[pid] = future.result()
+                except Exception as e:
+                    errors[pid] = e
+                    print(f"Error fetching {name}: {e}", flush=True)
+                    continue
+                print(f"Fetched {name}", flush=True)
+                if on_result:
+                    on_result(pid, *results[pid])
+        pending = {pid: pending[pid] for pid in errors}
+    return results, errors
+
+
+def fetch_roster():
+    # One request for the whole league: current team and roster status per player
+    from nba_api.stats.endpoints import commonallplayers
+    rows = commonallplayers.CommonAllPlayers(is_only_current_season=1, timeout=REQUEST_TIMEOUT).get_normalized_dict()
+    return {str(row['PERSON_ID']): row for row in rows['CommonAllPlayers']}
+
+
+def roster_changes(all_players, player_details, roster):
+    # Cached players whose team or active flag no longer matches the league roster
+    changed = []
+    for p in all_players:
+        pid = str(p['id'])
+        cached = player_details.get(pid)
+        row = roster.get(pid)
+        if not cached or row is None:
+            continue
+        was_active = cached.get('ROSTERSTATUS') == 'Active'
+        if cached.get('TEAM_ID') != row.get('TEAM_ID') or was_active != bool(row.get('ROSTERSTATUS')):
+            changed.append(p)
+    return changed
+
+
+def load_json(path):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def build_artifacts(data_dir, all_time=False):
+    build_table(data_dir)
+    if all_time:
+        from history_store import build_history
+        build_history(data_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch and cache NBA player details and career stats.")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help="requests per second across all workers")
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES)
+    parser.add_argument('--passes', type=int, default=DEFAULT_PASSES)
+    parser.add_argument('--refresh', action='store_true', help="re-fetch players whose team or roster status changed")
+    parser.add_argument('--compact-only', action='store_true', help="fold the journal into the JSON artifacts and exit")
+    parser.add_argument('--all-time', action='store_true', help="every player in NBA history, with per-season team history")
+    parser.add_argument('--data-dir', help=f"where the cache lives (default: . or {ALL_TIME_DIR}/ with --all-time)")
+    args = parser.parse_args()
+    data_dir = args.data_dir or (ALL_TIME_DIR if args.all_time else '.')
+    os.makedirs(data_dir, exist_ok=True)
+    path = lambda name: os.path.join(data_dir, name)
+
+    # Load existing details and stats if present, plus anything a crashed run journaled
+    journal = CacheJournal(path(JOURNAL_PATH))
+    player_details = load_json(path('player_details.json'))
+    player_stats = load_json(path('player_stats.json'))
+    resumed = journal.replay(player_details, player_stats)
+    if resumed:
+        print(f"Resumed {resumed} players from {JOURNAL_PATH}", flush=True)
+    if args.compact_only:
+        journal.compact(path('player_details.json'), path('player_stats.json'), player_details, player_stats)
+        build_artifacts(data_dir, args.all_time)
+        print("Done!", flush=True)
+        return
+
+    from nba_api.stats.static import players
+
+    print("Starting player data fetch...", flush=True)
+
+    # Fetch all active players, or everyone who ever played with --all-time
+    all_players = [p for p in players.get_players() if args.all_time or p.get('is_active')]
+
+    # Save basic player info
+    with open(path('players.json'), 'w') as f:
+        json.dump(all_players, f)
+
+    # Empty entries are failures from older runs, so they are fetched again
+    todo = [p for p in all_players if not player_details.get(str(p['id']))]
+    print(f"{len(all_players) - len(todo)} players already cached, fetching {len(todo)}", flush=True)
+    if args.refresh:
+        changed = roster_changes(all_players, player_details, fetch_roster())
+        print(f"{len(changed)} cached players changed team or roster status", flush=True)
+        todo.extend(changed)
+
+    results, errors = fetch_players(todo, workers=args.workers, rate=args.rate, retries=args.retries, passes=args.passes,
+                                    on_result=journal.append)
+    for pid, (details, stats) in results.items():
+        player_details[pid] = details
+        player_stats[pid] = stats
+
+    journal.compact(path('player_details.json'), path('player_stats.json'), player_details, player_stats)
+    build_artifacts(data_dir, args.all_time)
+    if errors:
+        print(f"{len(errors)} players failed and will be retried on the next run", flush=True)
+    print("Done!", flush=True)
 
-print("Starting player data fetch...", flush=True)
-
-# Fetch all active players
-all_players = [p for p in players.get_players() if p.get('is_active')]
-
-# Save basic player info
-with open('players.json', 'w') as f:
-    json.dump(all_players, f)
-
-# Load existing details and stats if present
-if os.path.exists('player_details.json'):
-    with open('player_details.json') as f:
-        player_details = json.load(f)
-else:
-    player_details = {}
-if os.path.exists('player_stats.json'):
-    with open('player_stats.json') as f:
-        player_stats = json.load(f)
-else:
-    player_stats = {}
-
-# Fetch and save detailed info for each player
-for p in all_players:
-    pid = str(p['id'])
-    if pid in player_details and player_details[pid]:
-        print(f"Skipping {p['full_name']} (already cached)", flush=True)
-        continue
-    try:
-        info = commonplayerinfo.CommonPlayerInfo(player_id=pid).get_normalized_dict()
-        player_details[pid] = info['CommonPlayerInfo'][0] if info['CommonPlayerInfo'] else {}
-        stats = playercareerstats.PlayerCareerStats(player_id=pid).get_normalized_dict()
-        if 'CareerStats' in stats and stats['CareerStats']:
-            player_stats[pid] = stats['CareerStats'][0]
-        elif 'CareerTotalsRegularSeason' in stats and stats['CareerTotalsRegularSeason']:
-            player_stats[pid] = stats['CareerTotalsRegularSeason'][0]
-        else:
-            player_stats[pid] = {}
-        print(f"Fetched {p['full_name']}", flush=True)
-        time.sleep(2)  # Increased sleep to 2 seconds to avoid rate limiting
-    except Exception as e:
-        print(f"Error fetching {p['full_name']}: {e}", flush=True)
-        player_details[pid] = {}
-        player_stats[pid] = {}
-
-with open('player_details.json', 'w') as f:
-    json.dump(player_details, f)
-with open('player_stats.json', 'w') as f:
-    json.dump(player_stats, f)
-print("Done!", flush=True)
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+from player_table import CONFERENCES, DIVISIONS
+
+# Game rules shared by the Flask app and the Kivy client. Players are
+# PlayerTable rows (see player_table.py).
+
+
+def compare_guess(guessed, target):
+    height_arrow = ''
+    if guessed.height_in >= 0 and target.height_in >= 0:
+        if guessed.height_in < target.height_in:
+            height_arrow = '↑'
+        elif guessed.height_in > target.height_in:
+            height_arrow = '↓'
+    weight_arrow = ''
+    weight_match = False
+    if guessed.weight and target.weight:
+        weight_match = abs(guessed.weight - target.weight) <= 10
+        if not weight_match:
+            weight_arrow = '↑' if guessed.weight < target.weight else '↓'
+    feedback = {
+        'player_id': guessed.id,
+        'name': guessed.name,
+        'team': guessed.team_abbr,
+        'position': guessed.position,
+        'height': guessed.height,
+        'weight': guessed.weight,
+        'conference': CONFERENCES[guessed.conf],
+        'division': DIVISIONS[guessed.div],
+        'team_match': guessed.team_id == target.team_id,
+        'position_match': bool(guessed.position_key) and guessed.position_key == target.position_key,
+        'height_match': guessed.height == target.height,
+        'weight_match': weight_match,
+        'conference_match': guessed.conf == target.conf and guessed.conf != 0,
+        'division_match': guessed.div == target.div and guessed.div != 0,
+        'height_arrow': height_arrow,
+        'weight_arrow': weight_arrow,
+    }
+    return feedback
+
+
+def check_win(guessed, target):
+    return guessed.name.lower() == target.name.lower()
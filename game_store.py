@@ -0,0 +1,136 @@
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import offload
+
+# Games nobody has touched for this long are dropped
+DEFAULT_TTL = 6 * 60 * 60
+
+
+class GameStore:
+    # Server-side game state keyed by an opaque game ID. The session cookie only
+    # carries the ID; the state itself is a small JSON-able dict.
+    def new_game_id(self):
+        return secrets.token_urlsafe(12)
+
+    def get(self, game_id):
+        raise NotImplementedError
+
+    def put(self, game_id, state):
+        raise NotImplementedError
+
+    def delete(self, game_id):
+        raise NotImplementedError
+
+
+class MemoryGameStore(GameStore):
+    # Per-process LRU with TTL. Fine for a single worker; use SqliteGameStore
+    # when gunicorn runs several.
+    def __init__(self, max_games=10000, ttl=DEFAULT_TTL):
+        self.max_games = max_games
+        self.ttl = ttl
+        self._games = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, game_id):
+        with self._lock:
+            entry = self._games.get(game_id)
+            if entry is None:
+                return None
+            expires, state = entry
+            if expires < time.time():
+                del self._games[game_id]
+                return None
+            self._games.move_to_end(game_id)
+            return state
+
+    def put(self, game_id, state):
+        with self._lock:
+            self._games[game_id] = (time.time() + self.ttl, state)
+            self._games.move_to_end(game_id)
+            while len(self._games) > self.max_games:
+                self._games.popitem(last=False)
+
+    def delete(self, game_id):
+        with self._lock:
+            self._games.pop(game_id, None)
+
+    def __len__(self):
+        return len(self._games)
+
+
+class SqliteGameStore(GameStore):
+    # Shared between worker processes through one SQLite file in WAL mode.
+    # Queries run through offload.run, so under gevent they happen on the
+    # blocking pool's threads: one connection per pool thread, not one per
+    # greenlet. Connections are per process; none survive a fork.
+    def __init__(self, path, ttl=DEFAULT_TTL, purge_every=500):
+        self.path = path
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._writes = 0
+        self._local = threading.local()
+        # Not kept: this usually runs in the gunicorn master
+        conn = self._open()
+        with conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS games (id TEXT PRIMARY KEY, state TEXT NOT NULL, expires REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS games_expires ON games (expires)')
+        conn.close()
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._open()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, game_id):
+        row = offload.run(self._get, game_id)
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def _get(self, game_id):
+        return self._connect().execute('SELECT state, expires FROM games WHERE id = ?', (game_id,)).fetchone()
+
+    def put(self, game_id, state):
+        self._writes += 1
+        offload.run(self._put, game_id, json.dumps(state, separators=(',', ':')), self._writes % self.purge_every == 0)
+
+    def _put(self, game_id, state, purge):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO games (id, state, expires) VALUES (?, ?, ?)', (game_id, state, now + self.ttl))
+            if purge:
+                conn.execute('DELETE FROM games WHERE expires < ?', (now,))
+
+    def delete(self, game_id):
+        offload.run(self._delete, game_id)
+
+    def _delete(self, game_id):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM games WHERE id = ?', (game_id,))
+
+
+def create_store():
+    # GAME_STORE=sqlite (with GAME_STORE_PATH) for multi-worker deployments
+    kind = os.environ.get('GAME_STORE', 'memory').lower()
+    ttl = int(os.environ.get('GAME_STORE_TTL', DEFAULT_TTL))
+    if kind == 'sqlite':
+        path = os.environ.get('GAME_STORE_PATH', os.path.join(os.path.dirname(__file__), 'games.sqlite3'))
+        return SqliteGameStore(path, ttl=ttl)
+    if kind == 'memory':
+        return MemoryGameStore(max_games=int(os.environ.get('GAME_STORE_MAX', 10000)), ttl=ttl)
+    raise ValueError(f"Unknown GAME_STORE: {kind}")
@@ -0,0 +1,40 @@
+import hashlib
+import hmac
+import secrets
+from collections import namedtuple
+
+from itsdangerous import BadSignature, URLSafeSerializer
+
+# Self-contained game state for the JSON API. The whole game (target, data
+# version, guessed player IDs, mode) travels in a signed token, so the server
+# keeps nothing between calls. The target ID is masked with an HMAC keystream
+# derived from a per-game nonce, so the answer cannot be read out of the
+# token; the signature stops it being edited.
+
+SALT = 'hoopmind-game'
+
+TokenGame = namedtuple('TokenGame', ['nonce', 'target_id', 'version', 'guesses', 'mode'])
+
+
+class GameTokens:
+    def __init__(self, secret_key):
+        self.serializer = URLSafeSerializer(secret_key, salt=SALT)
+        self.mask_key = hashlib.sha256(f"{SALT}:{secret_key}".encode()).digest()
+
+    def _mask(self, nonce):
+        return int.from_bytes(hmac.new(self.mask_key, nonce.encode(), 'sha256').digest()[:4], 'big')
+
+    def new_game(self, target_id, version, mode='random'):
+        return TokenGame(secrets.token_urlsafe(6), target_id, version, [], mode)
+
+    def dumps(self, game):
+        return self.serializer.dumps([game.nonce, game.target_id ^ self._mask(game.nonce), game.version,
+                                      game.guesses, game.mode])
+
+    def loads(self, token):
+        # The game, or None if the token is malformed or was tampered with
+        try:
+            nonce, masked, version, guesses, mode = self.serializer.loads(token)
+        except (BadSignature, TypeError, ValueError):
+            return None
+        return TokenGame(nonce, masked ^ self._mask(nonce), version, guesses, mode)
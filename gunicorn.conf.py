@@ -0,0 +1,23 @@
+import os
+
+# Production serving config: gunicorn -c gunicorn.conf.py
+#
+# HOOPMIND_WORKER_CLASS=gevent (what render.yaml uses) serves many slow
+# clients and keystroke-driven /player_suggestions requests per worker;
+# blocking work goes to the bounded pool in offload.py. The default sync
+# workers hold one request each. WEB_CONCURRENCY sets the worker count as
+# usual.
+#
+# The app is preloaded: create_app() builds the player data once in the
+# master and every forked worker shares it. For gevent the master has to be
+# patched before that import, so it is done here, ahead of everything else.
+
+worker_class = os.environ.get('HOOPMIND_WORKER_CLASS', 'sync')
+if worker_class == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+wsgi_app = 'app:create_app()'
+preload_app = True
+worker_connections = int(os.environ.get('HOOPMIND_WORKER_CONNECTIONS', 1000))
+timeout = 30
@@ -0,0 +1,186 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO
+
+from PIL import Image
+from player_table import DATA_DIR, load_player_table
+from silhouette import HEADSHOT_URL, RESOLUTIONS, FULL_RES, render_silhouette
+
+# Offline headshot bundle. Each headshot is downloaded once at full
+# resolution; every reveal level is derived locally and stored, already
+# rendered as a silhouette, next to the original in one packed file:
+#
+#   [PNG blobs ...][JSON index][footer]
+#
+# The index maps person ID -> {key: [offset, length]}, where key is a reveal
+# resolution ('52x40' ... '1040x760') or 'full' for the unmasked headshot.
+# Readers mmap the file, so lookups are a dict access plus a slice.
+
+BUNDLE_FILE = os.environ.get('HEADSHOT_BUNDLE', os.path.join(DATA_DIR, 'headshots.bundle'))
+MAGIC = b'HMHB'
+VERSION = 1
+FOOTER = struct.Struct('<4sHQI')  # magic, version, index offset, index length
+FULL = 'full'
+
+
+def derive_levels(full_png):
+    # {key: png bytes} for every reveal level plus the original
+    img = Image.open(BytesIO(full_png)).convert("RGBA")
+    out = {FULL: full_png}
+    for res in RESOLUTIONS[1:]:
+        w, h = (int(n) for n in res.split('x'))
+        if (img.width, img.height) == (w, h):
+            level_png = full_png
+        else:
+            buf = BytesIO()
+            img.resize((w, h), Image.LANCZOS).save(buf, format="PNG")
+            level_png = buf.getvalue()
+        out[res] = render_silhouette(level_png)
+    return out
+
+
+class HeadshotBundle:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_offset, index_len = FOOTER.unpack_from(self._buf, len(self._buf) - FOOTER.size)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} headshot bundle")
+        self.index = json.loads(bytes(self._buf[index_offset:index_offset + index_len]))
+
+    def __contains__(self, person_id):
+        return str(person_id) in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def get(self, person_id, key):
+        entry = self.index.get(str(person_id), {}).get(key)
+        if entry is None:
+            return None
+        offset, length = entry
+        return self._buf[offset:offset + length]
+
+    def entries(self, person_id):
+        return {key: self.get(person_id, key) for key in self.index.get(str(person_id), {})}
+
+
+class BundleWriter:
+    def __init__(self, path):
+        self.path = path
+        self.tmp = f"{path}.tmp"
+        self._file = open(self.tmp, 'wb')
+        self.index = {}
+        self.lock = threading.Lock()
+
+    def add(self, person_id, blobs):
+        with self.lock:
+            entry = {}
+            for key, data in blobs.items():
+                entry[key] = [self._file.tell(), len(data)]
+                self._file.write(data)
+            self.index[str(person_id)] = entry
+
+    def close(self):
+        index = json.dumps(self.index, separators=(',', ':')).encode()
+        offset = self._file.tell()
+        self._file.write(index)
+        self._file.write(FOOTER.pack(MAGIC, VERSION, offset, len(index)))
+        self._file.close()
+        os.replace(self.tmp, self.path)
+
+
+def download(session, url, timeout=10):
+    resp = session.get(url, timeout=timeout)
+    if resp.status_code != 200:
+        return None
+    return resp.content
+
+
+def prefetch_headshots(person_ids, path=BUNDLE_FILE, url_template=HEADSHOT_URL, workers=8, rate=10.0, refresh=False):
+    # Builds (or extends) the bundle. Players already bundled are copied over
+    # unless refresh is set. Returns the person IDs that could not be fetched.
+    import requests
+    from fetch_and_cache_players import TokenBucket
+
+    existing = None
+    if not refresh and os.path.exists(path):
+        try:
+            existing = HeadshotBundle(path)
+        except (OSError, ValueError):
+            existing = None
+    writer = BundleWriter(path)
+    todo = []
+    for pid in person_ids:
+        if existing is not None and pid in existing:
+            writer.add(pid, {key: bytes(data) for key, data in existing.entries(pid).items()})
+        else:
+            todo.append(pid)
+    print(f"{len(person_ids) - len(todo)} headshots already bundled, downloading {len(todo)}", flush=True)
+
+    limiter = TokenBucket(rate, rate)
+    local = threading.local()
+
+    def fetch(pid):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        limiter.acquire()
+        full = download(local.session, url_template.format(res=FULL_RES, person_id=pid))
+        return derive_levels(full) if full else None
+
+    missing = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch, pid): pid for pid in todo}
+        for future in as_completed(futures):
+            pid = futures[future]
+            try:
+                blobs = future.result()
+            except Exception as e:
+                print(f"Error fetching headshot {pid}: {e}", flush=True)
+                blobs = None
+            if blobs:
+                writer.add(pid, blobs)
+            else:
+                missing.append(pid)
+    writer.close()
+    return missing
+
+
+_bundle = None
+_bundle_checked = False
+
+
+def default_bundle():
+    # The shared bundle if one has been built, else None
+    global _bundle, _bundle_checked
+    if not _bundle_checked:
+        _bundle_checked = True
+        if os.path.exists(BUNDLE_FILE):
+            try:
+                _bundle = HeadshotBundle(BUNDLE_FILE)
+            except (OSError, ValueError):
+                _bundle = None
+    return _bundle
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download headshots once and pack every reveal level into a bundle.")
+    parser.add_argument('--output', default=BUNDLE_FILE)
+    parser.add_argument('--url-template', default=HEADSHOT_URL, help="e.g. http://localhost:8000/{res}/{person_id}.png")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=10.0, help="downloads per second")
+    parser.add_argument('--refresh', action='store_true', help="download every headshot again")
+    args = parser.parse_args()
+    person_ids = [row.id for row in load_player_table()]
+    missing = prefetch_headshots(person_ids, args.output, args.url_template, args.workers, args.rate, args.refresh)
+    print(f"Bundled {len(person_ids) - len(missing)} headshots into {args.output}", flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from player_table import DATA_DIR, load_json_sources
+
+# Per-season team history for the all-time dataset, kept out of worker memory.
+#
+# The hot per-player columns live in player_table.bin (mmapped, shared between
+# workers). The long tail - one row per player, season and team - goes into an
+# indexed SQLite file next to it and is read on demand:
+#
+#   careers(player_id PRIMARY KEY, first_season, last_season)
+#   seasons(player_id, season, team, gp, pts, reb, ast)
+#     indexed by (season, player_id) and (team, season)
+#
+# Era filters are range scans on the season index, so a game mode asking for
+# "1990s players" never touches the rest of the set.
+
+HISTORY_FILE = 'player_history.sqlite3'
+CACHE_SIZE = 1024  # team histories kept per worker
+ERA_PATTERN = re.compile(r'^(\d{4})s$|^(\d{4})-(\d{4})$')
+
+SCHEMA = """
+CREATE TABLE careers (player_id INTEGER PRIMARY KEY, first_season INTEGER, last_season INTEGER);
+CREATE TABLE seasons (player_id INTEGER, season INTEGER, team TEXT, gp INTEGER, pts INTEGER, reb INTEGER, ast INTEGER,
+                      PRIMARY KEY (player_id, season, team)) WITHOUT ROWID;
+CREATE INDEX seasons_by_season ON seasons (season, player_id);
+CREATE INDEX seasons_by_team ON seasons (team, season);
+"""
+
+
+def parse_era(era):
+    # '1990s' -> (1990, 1999), '1984-1998' -> (1984, 1998), else None
+    if not isinstance(era, str):
+        return None
+    match = ERA_PATTERN.match(era)
+    if not match:
+        return None
+    if match.group(1):
+        start = int(match.group(1))
+        return start, start + 9
+    return int(match.group(2)), int(match.group(3))
+
+
+def build_history(data_dir=DATA_DIR):
+    # Rebuilds the history file from the SEASONS lists in player_stats.json
+    _, _, stats = load_json_sources(data_dir)
+    path = os.path.join(data_dir, HISTORY_FILE)
+    tmp = f"{path}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    conn.executescript(SCHEMA)
+    for pid, career in stats.items():
+        rows = [(int(pid), *season) for season in (career or {}).get('SEASONS') or []]
+        if not rows:
+            continue
+        conn.executemany("INSERT OR REPLACE INTO seasons VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.execute("INSERT INTO careers VALUES (?, ?, ?)", (int(pid), min(r[1] for r in rows), max(r[1] for r in rows)))
+    conn.commit()
+    conn.close()
+    os.replace(tmp, path)
+    return path
+
+
+class HistoryStore:
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._histories = OrderedDict()
+        self._eras = {}
+
+    def _conn(self):
+        # Read-only, one connection per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def era_ids(self, first, last):
+        # IDs of everyone who played a season in [first, last]
+        key = (first, last)
+        ids = self._eras.get(key)
+        if ids is None:
+            rows = self._conn().execute("SELECT DISTINCT player_id FROM seasons WHERE season BETWEEN ? AND ?", key)
+            ids = frozenset(pid for (pid,) in rows)
+            with self._lock:
+                if len(self._eras) > 32:
+                    self._eras.clear()
+                self._eras[key] = ids
+        return ids
+
+    def career_span(self, player_id):
+        row = self._conn().execute("SELECT first_season, last_season FROM careers WHERE player_id = ?", (int(player_id),)).fetchone()
+        return tuple(row) if row else None
+
+    def team_history(self, player_id):
+        # [(season, team, gp, pts, reb, ast)], oldest first; LRU-cached
+        pid = int(player_id)
+        with self._lock:
+            history = self._histories.get(pid)
+            if history is not None:
+                self._histories.move_to_end(pid)
+                return history
+        history = self._conn().execute(
+            "SELECT season, team, gp, pts, reb, ast FROM seasons WHERE player_id = ? ORDER BY season, team", (pid,)).fetchall()
+        with self._lock:
+            self._histories[pid] = history
+            while len(self._histories) > CACHE_SIZE:
+                self._histories.popitem(last=False)
+        return history
+
+    def teams(self, player_id):
+        # Distinct teams in the order the player joined them
+        seen = []
+        for _, team, *_ in self.team_history(player_id):
+            if team not in seen:
+                seen.append(team)
+        return seen
+
+
+def open_history(data_dir=DATA_DIR):
+    # The store for data_dir if its history file has been built, else None
+    try:
+        return HistoryStore(os.path.join(data_dir, HISTORY_FILE))
+    except FileNotFoundError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the per-season history database from player_stats.json.")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    args = parser.parse_args()
+    path = build_history(args.data_dir)
+    print(f"Wrote {path}", flush=True)
+
+
+if __name__ == '__main__':
+    main()
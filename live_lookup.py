@@ -0,0 +1,82 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Background lookups for the desktop client. Work runs on a small thread pool,
+# results are delivered through a caller-supplied post(callback, value)
+# (the GUI passes one that goes through kivy's Clock, so callbacks run on the
+# UI thread), and every result is kept in a TTL cache so nothing is fetched
+# twice in a session. Concurrent requests for the same key share one job.
+
+DEFAULT_TTL = 30 * 60
+
+
+class TTLCache:
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return default
+            expires, value = item
+            if expires < time.monotonic():
+                del self._items[key]
+                return default
+            return value
+
+    def __contains__(self, key):
+        return self.get(key, self) is not self
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+
+
+class BackgroundWorker:
+    def __init__(self, post, max_workers=4, ttl=DEFAULT_TTL):
+        self.post = post
+        self.cache = TTLCache(ttl)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hoopmind')
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, callback, *args):
+        if key in self.cache:
+            self.post(callback, self.cache.get(key))
+            return
+        with self._lock:
+            waiting = self._pending.get(key)
+            if waiting is not None:
+                waiting.append(callback)
+                return
+            self._pending[key] = [callback]
+        self._pool.submit(self._run, key, fn, args)
+
+    def _run(self, key, fn, args):
+        try:
+            value = fn(*args)
+        except Exception:
+            value = None
+        self.cache.put(key, value)
+        with self._lock:
+            callbacks = self._pending.pop(key, [])
+        for callback in callbacks:
+            self.post(callback, value)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_player_row(player_id, full_name=''):
+    # Live nba_api lookup for a player missing from the local cache, returned
+    # as a PlayerTable row so it plugs into the shared game logic
+    from fetch_and_cache_players import fetch_player, default_endpoints, TokenBucket
+    from player_table import build_rows
+    details, stats = fetch_player(str(player_id), TokenBucket(1, 1), default_endpoints())
+    pid = str(player_id)
+    return build_rows([{'id': player_id, 'full_name': full_name or details.get('DISPLAY_FIRST_LAST', '')}],
+                      {pid: details}, {pid: stats})[0]
@@ -0,0 +1,204 @@
+import atexit
+import bisect
+import contextlib
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Minimal in-process metrics with Prometheus text output.
+#
+# HOOPMIND_METRICS=1 turns collection on. When it is off, timer() hands back
+# a shared no-op context manager and timed() returns the function unchanged,
+# so instrumented code paths cost one attribute check.
+#
+# Each gunicorn worker keeps its own numbers; a scrape of /metrics reports the
+# worker that served it (see the pid label on hoopmind_process_start_time_seconds).
+
+ENABLED = os.environ.get('HOOPMIND_METRICS', '0') == '1'
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+FAST_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01)
+SIZE_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096)
+
+
+class Histogram:
+    def __init__(self, name, help, buckets, labelnames=()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, ([*counts], total, count)) for labels, (counts, total, count) in self._series.items())
+        for labels, (counts, total, count) in items:
+            base = [f'{k}="{v}"' for k, v in zip(self.labelnames, labels)]
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float('inf'),), counts):
+                cumulative += n
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                pairs = ','.join(base + ['le="%s"' % le])
+                lines.append(f"{self.name}_bucket{{{pairs}}} {cumulative}")
+            suffix = f"{{{','.join(base)}}}" if base else ''
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def set(self, value, *labels):
+        self._values[labels] = value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, value in sorted(self._values.items()):
+            pairs = ','.join(f'{k}="{v}"' for k, v in zip(self.labelnames, labels))
+            lines.append(f"{self.name}{{{pairs}}} {value}" if pairs else f"{self.name} {value}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram('hoopmind_request_duration_seconds', 'Request latency by route.', LATENCY_BUCKETS, ('route', 'method', 'status'))
+OPERATION_LATENCY = Histogram('hoopmind_operation_duration_seconds', 'Time spent in hot-path operations.', FAST_BUCKETS, ('operation',))
+COOKIE_SIZE = Histogram('hoopmind_session_cookie_bytes', 'Size of the session cookie sent with responses.', SIZE_BUCKETS)
+DATA_LOAD = Gauge('hoopmind_data_load_seconds', 'Time spent loading data at import.', ('stage',))
+PROCESS_START = Gauge('hoopmind_process_start_time_seconds', 'Unix time this worker started.', ('pid',))
+EVENTS_DROPPED = Gauge('hoopmind_events_dropped', 'Gameplay events dropped because the event log queue was full.')
+REGISTRY = [REQUEST_LATENCY, OPERATION_LATENCY, COOKIE_SIZE, DATA_LOAD, PROCESS_START, EVENTS_DROPPED]
+
+_NOOP = contextlib.nullcontext()
+
+
+class _Timer:
+    __slots__ = ('labels', 'histogram', 'started')
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+def timer(operation):
+    return _Timer(OPERATION_LATENCY, (operation,)) if ENABLED else _NOOP
+
+
+def timed(operation):
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Timer(OPERATION_LATENCY, (operation,)):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextlib.contextmanager
+def load_stage(stage):
+    # Data-load timings are always recorded; they happen once per process
+    started = time.perf_counter()
+    yield
+    DATA_LOAD.set(time.perf_counter() - started, stage)
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def init_app(app):
+    # Registers request hooks and the /metrics endpoint. Without
+    # HOOPMIND_METRICS=1 only /metrics is added (it then reports load times).
+    from flask import g, request, request_finished
+
+    PROCESS_START.set(time.time(), os.getpid())
+
+    @app.route('/metrics')
+    def metrics():
+        return app.response_class(render(), mimetype='text/plain; version=0.0.4')
+
+    if not ENABLED:
+        return
+
+    cookie_name = app.config.get('SESSION_COOKIE_NAME', 'session')
+
+    @app.before_request
+    def start_timer():
+        g.metrics_started = time.perf_counter()
+
+    # request_finished fires after the session cookie has been written, so
+    # both the latency and the Set-Cookie header include session saving
+    def record_request(sender, response, **extra):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            REQUEST_LATENCY.observe(time.perf_counter() - started, route, request.method, response.status_code)
+        for header in response.headers.getlist('Set-Cookie'):
+            if header.startswith(cookie_name + '='):
+                COOKIE_SIZE.observe(len(header))
+
+    request_finished.connect(record_request, app, weak=False)
+
+    profile_path = os.environ.get('HOOPMIND_PROFILE')
+    if profile_path:
+        start_sampling_profiler(profile_path, float(os.environ.get('HOOPMIND_PROFILE_INTERVAL', 0.005)))
+
+
+def start_sampling_profiler(path, interval=0.005):
+    # Samples every thread's stack at a fixed interval and writes collapsed
+    # stacks (one "frame;frame;frame count" line each, flamegraph.pl input)
+    # to path, suffixed with the pid, when the process exits.
+    samples = Counter()
+    stop = threading.Event()
+
+    def sample():
+        while not stop.wait(interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == sampler.ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                samples[';'.join(reversed(stack))] += 1
+
+    def dump():
+        stop.set()
+        with open(f"{path}.{os.getpid()}", 'w') as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+    sampler = threading.Thread(target=sample, name='hoopmind-profiler', daemon=True)
+    sampler.start()
+    atexit.register(dump)
+    return stop
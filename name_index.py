@@ -0,0 +1,175 @@
+import heapq
+import unicodedata
+from collections import Counter
+
+# Every substring up to this length gets its own postings list, so short
+# queries are a single dict lookup and longer ones intersect n-gram postings.
+GRAM_SIZE = 3
+
+# Queries this long that match no substring fall back to typo-tolerant
+# matching: shortlist names by padded-trigram similarity, then keep the ones
+# within a few edits of the query.
+FUZZY_MIN_LEN = 4
+FUZZY_SHORTLIST = 8
+
+
+def normalize_name(name):
+    # Accent-fold and lowercase so "Jokić" matches "jokic"; punctuation that
+    # players type inconsistently is dropped or treated as a space.
+    folded = unicodedata.normalize('NFKD', name or '')
+    folded = ''.join(c for c in folded if not unicodedata.combining(c))
+    folded = folded.lower().replace('.', '').replace("'", '').replace('-', ' ')
+    return ' '.join(folded.split())
+
+
+def _grams(text):
+    grams = set()
+    for n in range(1, GRAM_SIZE + 1):
+        for i in range(len(text) - n + 1):
+            grams.add(text[i:i + n])
+    return grams
+
+
+def _trigrams(text):
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(query):
+    return 1 if len(query) <= 5 else 2 if len(query) <= 9 else 3
+
+
+def edit_distance(a, b, limit):
+    # Levenshtein distance, or limit + 1 as soon as it must exceed limit.
+    # Only cells within limit of the diagonal are computed.
+    over = limit + 1
+    if abs(len(a) - len(b)) > limit:
+        return over
+    width = len(b)
+    previous = [j if j <= limit else over for j in range(width + 1)]
+    for i, ca in enumerate(a, 1):
+        current = [over] * (width + 1)
+        if i <= limit:
+            current[0] = i
+        best = current[0]
+        for j in range(max(1, i - limit), min(width, i + limit) + 1):
+            d = previous[j - 1] if ca == b[j - 1] else previous[j - 1] + 1
+            if previous[j] + 1 < d:
+                d = previous[j] + 1
+            if current[j - 1] + 1 < d:
+                d = current[j - 1] + 1
+            current[j] = d
+            if d < best:
+                best = d
+        if best > limit:
+            return over
+        previous = current
+    return min(previous[-1], over)
+
+
+class NameIndex:
+    def __init__(self, players, key='full_name'):
+        # key is a dict key, or a callable for non-dict records
+        get_name = key if callable(key) else (lambda p: p.get(key, ''))
+        self.players = list(players)
+        self.names = [normalize_name(get_name(p)) for p in self.players]
+        self.tokens = [name.split() for name in self.names]
+        self.postings = {}
+        for pos, name in enumerate(self.names):
+            for gram in _grams(name):
+                self.postings.setdefault(gram, []).append(pos)
+        self.fuzzy_postings = {}
+        for pos, name in enumerate(self.names):
+            for gram in _trigrams(name):
+                self.fuzzy_postings.setdefault(gram, []).append(pos)
+
+    def __len__(self):
+        return len(self.players)
+
+    def _candidates(self, query):
+        if len(query) <= GRAM_SIZE:
+            return self.postings.get(query, [])
+        lists = []
+        for i in range(len(query) - GRAM_SIZE + 1):
+            posting = self.postings.get(query[i:i + GRAM_SIZE])
+            if not posting:
+                return []
+            lists.append(posting)
+        lists.sort(key=len)
+        candidates = set(lists[0])
+        for posting in lists[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        # n-gram intersection can give false positives, confirm the substring
+        return [pos for pos in candidates if query in self.names[pos]]
+
+    def _rank(self, pos, query):
+        name = self.names[pos]
+        if name == query:
+            tier = 0
+        elif name.startswith(query):
+            tier = 1
+        elif any(token.startswith(query) for token in self.tokens[pos]):
+            tier = 2
+        else:
+            tier = 3
+        return (tier, name.find(query), len(name), pos)
+
+    def _closest(self, pos, query, limit):
+        # Edit distance from the query to the best run of as many name
+        # tokens, or one more for typos that replace or drop a space
+        tokens = self.tokens[pos]
+        width = query.count(' ') + 1
+        return min(edit_distance(query, ' '.join(tokens[i:i + w]), limit)
+                   for w in (width, width + 1) for i in range(max(1, len(tokens) - w + 1)))
+
+    def fuzzy_positions(self, query, limit=None):
+        # Names within max_typos(query) edits, closest first
+        if len(query) < FUZZY_MIN_LEN:
+            return []
+        grams = _trigrams(query)
+        hits = Counter()
+        for gram in grams:
+            posting = self.fuzzy_postings.get(gram)
+            if posting:
+                hits.update(posting)
+        # Each edit breaks at most three of the query's trigrams
+        typos = max_typos(query)
+        need = len(grams) - 3 * typos
+        ranked = []
+        for pos, shared in hits.most_common(FUZZY_SHORTLIST):
+            if shared < need:
+                break
+            distance = self._closest(pos, query, typos)
+            if distance <= typos:
+                ranked.append((distance, -shared, len(self.names[pos]), pos))
+        ranked.sort()
+        return [pos for *_, pos in ranked[:limit]]
+
+    def search_positions(self, query, limit=None):
+        # Substring matches ranked by _rank; typo-tolerant matches only when
+        # there are none
+        query = normalize_name(query)
+        if not query:
+            return []
+        candidates = self._candidates(query)
+        if not candidates:
+            return self.fuzzy_positions(query, limit)
+        rank = lambda pos: self._rank(pos, query)
+        if limit is not None:
+            return heapq.nsmallest(limit, candidates, key=rank)
+        return sorted(candidates, key=rank)
+
+    def search(self, query, limit=None):
+        return [self.players[pos] for pos in self.search_positions(query, limit)]
+
+    def precompute(self, min_len=2, max_len=GRAM_SIZE, limit=10):
+        # Ranked positions for every short query that matches something,
+        # keyed by normalized query
+        return {gram: self.search_positions(gram, limit) for gram in self.postings
+                if min_len <= len(gram) <= max_len and gram == gram.strip()}
+
+    def best_match(self, query):
+        found = self.search_positions(query, limit=1)
+        return self.players[found[0]] if found else None
@@ -1,48 +1,101 @@
-import kivy
+import time
+STARTUP_STARTED = time.perf_counter()
+# Only what the first frame needs is imported up front; numpy/PIL (via
+# silhouette), nba_api and the popup are imported where they are first used
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.image import AsyncImage
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.button import Button
-from kivy.uix.popup import Popup
-from kivy.core.window import Window
-from kivy.uix.widget import Widget
-from kivy.uix.progressbar import ProgressBar
 from kivy.clock import Clock
 from kivy.uix.scrollview import ScrollView
-from kivy.uix.gridlayout import GridLayout
-from kivy.properties import StringProperty
-from kivy.uix.anchorlayout import AnchorLayout
-from kivy.uix.screenmanager import ScreenManager, Screen
 import random
 import json
 import os
-from datetime import datetime
-from nba_api.stats.static import players
-from nba_api.stats.endpoints import commonplayerinfo, playercareerstats
-import requests
-from PIL import Image
-from io import BytesIO
-import tempfile
+from datetime import date, datetime
+from functools import partial
+from operator import attrgetter
+from name_index import NameIndex
+from player_table import load_player_table, HAS_DETAILS
+from game_logic import compare_guess, check_win
+from clues import load_clues
+from stats_store import PlayerStats, StatsStore
+from live_lookup import BackgroundWorker, fetch_player_row
 
+# Streaks and time-attack bests, in the same SQLite stats store the web app
+# uses (see stats_store.py). STREAK_FILE is only read to import old streaks.
+STATS_FILE = "nba_stats.sqlite3"
 STREAK_FILE = "nba_streak.json"
+LOCAL_USER = 'local'
+# Set HOOPMIND_STARTUP_REPORT to a path to get time-to-first-frame and
+# time-to-playable written there (benchmarks/startup.py uses this)
+STARTUP_REPORT = os.environ.get('HOOPMIND_STARTUP_REPORT')
+STARTUP_EXIT = os.environ.get('HOOPMIND_STARTUP_EXIT') == '1'
+
+def load_roster():
+    # Runs on the background worker: the prebuilt player table is the local
+    # roster snapshot, so this never touches the network
+    table = load_player_table()
+    return table, NameIndex(table.rows, key=attrgetter('full_name')), load_clues()
+
+def load_stats():
+    # Also on the worker: opening the SQLite store, and importing an old
+    # streak file, stays off the UI thread
+    stats = StatsStore(STATS_FILE)
+    return stats, streak_data(stats.user(LOCAL_USER) or import_streak_file(stats))
+
+def import_streak_file(stats):
+    # The store's writer thread saves the imported row; the values shown
+    # come straight from the file, so nothing waits for the write
+    try:
+        with open(STREAK_FILE, 'r') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    last = data.get("last_session")
+    day = datetime.strptime(last, "%Y%m%d").date().isoformat() if last else None
+    streak, best = data.get("streak", 0), data.get("time_attack_best", 0)
+    stats.restore(LOCAL_USER, streak, best, day)
+    return PlayerStats(LOCAL_USER, '', streak, streak, 0, 0, best, day, 0)
+
+def streak_data(row):
+    # The streak only carries over within a day
+    if row is None:
+        return {"streak": 0, "last_session": None, "time_attack_best": 0}
+    streak = row.streak if row.last_played == date.today().isoformat() else 0
+    return {"streak": streak, "last_session": row.last_played, "time_attack_best": row.time_attack_best}
 
 class NBAPlayerGuesserGUI(App):
     def build(self):
         from kivy.utils import get_color_from_hex
         self.title = "HoopMind"
-        self.session_id = datetime.now().strftime("%Y%m%d")
-        self.streak_data = self.load_streak()
+        # Filled in by on_stats_loaded; the store is opened on the worker
+        self.stats = None
+        self.stats_loaded = False
+        self.streak_data = streak_data(None)
         self.max_attempts = 6
         self.guesses = []
-        self.all_players = [p for p in players.get_players() if p.get('is_active')]
+        # Same cached player table the Flask app serves from, loaded after the
+        # window is up (see on_roster_loaded). Anything missing from it is
+        # looked up live on a background worker, never on the UI thread
+        self.player_table = None
+        self.all_players = []
+        self.target_pool = []
+        self.name_index = None
+        self.clue_table = None
+        self.startup_times = {}
+        self.worker = BackgroundWorker(post=lambda callback, value: Clock.schedule_once(lambda dt: callback(value)))
+        self.wanted_image = None
         self.target_player = None
         self.target_player_info = None
         self.reveal_level = 0
-        self.mode = 'original'  # Always original mode
+        self.mode = 'original'  # or 'time_attack' while a run is going
         self.time_left = 60
         self.score = 0
+        self.run = None
+        self.run_clock = None
+        self.end_popup = None  # pending end-of-game popup
         # --- Custom Font Setup ---
         # Download and use a Google Fonts TTF (Montserrat) for a modern look
         # Place 'Montserrat-Bold.ttf' and 'Montserrat-Regular.ttf' in the same directory as this script
@@ -65,7 +118,7 @@ class NBAPlayerGuesserGUI(App):
         self.status_label = Label(text="Guess the NBA player in 6 tries!", markup=True, font_size=22, size_hint=(1, 0.08), color=get_color_from_hex('#C9082A'))
         self.root.add_widget(self.status_label)
         # --- Image Frame with Rounded Corners and Drop Shadow ---
-        image_frame = BoxLayout(size_hint=(1, 0.45), padding=8)
+        image_frame = BoxLayout(size_hint=(1, 0.39), padding=8)
         with image_frame.canvas.before:
             # Drop shadow
             Color(0, 0, 0, 0.35)
@@ -118,132 +171,174 @@ class NBAPlayerGuesserGUI(App):
         self.submit_btn.bind(on_press=self.submit_guess)
         input_row.add_widget(self.submit_btn)
         self.root.add_widget(input_row)
+        # --- Time attack controls ---
+        mode_row = BoxLayout(orientation='horizontal', size_hint=(1, 0.06), spacing=8)
+        self.mode_btn = Button(text="Time Attack (60s)", font_size=16, background_color=get_color_from_hex('#1D428A'), color=get_color_from_hex('#FDB927'))
+        self.mode_btn.bind(on_press=self.toggle_time_attack)
+        mode_row.add_widget(self.mode_btn)
+        self.skip_btn = Button(text="Skip", font_size=16, background_color=get_color_from_hex('#1D428A'), color=get_color_from_hex('#FDB927'))
+        self.skip_btn.bind(on_press=self.skip_player)
+        mode_row.add_widget(self.skip_btn)
+        self.root.add_widget(mode_row)
         # --- Guess history in a scrollable area ---
         scroll = ScrollView(size_hint=(1, 0.17), bar_color=get_color_from_hex('#FDB927'))
         self.guess_history = Label(text="", markup=True, font_size=16, size_hint=(1, None), color=get_color_from_hex('#F5F5F5'))
         self.guess_history.bind(texture_size=self.guess_history.setter('size'))
         scroll.add_widget(self.guess_history)
         self.root.add_widget(scroll)
-        self.start_new_game()
+        self.guess_input.disabled = True
+        self.submit_btn.disabled = True
+        self.mode_btn.disabled = True
+        self.skip_btn.disabled = True
+        self.status_label.text = "[b]Loading players...[/b]"
+        self.worker.submit(('roster',), load_roster, self.on_roster_loaded)
+        self.worker.submit(('stats',), load_stats, self.on_stats_loaded)
         return self.root
 
-    def load_streak(self):
-        try:
-            with open(STREAK_FILE, 'r') as f:
-                data = json.load(f)
-                today = datetime.now().strftime("%Y%m%d")
-                if data.get("last_session") != today:
-                    data["streak"] = 0
-                return data
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {"streak": 0, "last_session": None}
-
-    def save_streak(self):
-        with open(STREAK_FILE, 'w') as f:
-            json.dump(self.streak_data, f)
+    def on_start(self):
+        from kivy.core.window import Window
+        def first_frame(*args):
+            Window.unbind(on_flip=first_frame)
+            self.mark_startup('first_frame')
+        Window.bind(on_flip=first_frame)
+
+    def on_roster_loaded(self, roster):
+        if roster is None:
+            self.status_label.text = "[color=ff0000][b]Could not load player data. Run fetch_and_cache_players.py first.[/b][/color]"
+            return
+        self.player_table, self.name_index, self.clue_table = roster
+        self.all_players = self.player_table.rows
+        self.target_pool = [p for p in self.all_players if p.flags & HAS_DETAILS]
+        self.ready_if_loaded()
+
+    def on_stats_loaded(self, loaded):
+        # None if the stats file could not be opened: play on without saving
+        if loaded is not None:
+            self.stats, self.streak_data = loaded
+        self.stats_loaded = True
+        self.ready_if_loaded()
+
+    def ready_if_loaded(self):
+        # Playable once both the roster and the stats store are in
+        if self.player_table is None or not self.stats_loaded:
+            return
+        self.guess_input.disabled = False
+        self.submit_btn.disabled = False
+        self.mode_btn.disabled = False
+        self.start_new_game()
+        self.mark_startup('playable')
+
+    def mark_startup(self, event):
+        self.startup_times[event] = time.perf_counter() - STARTUP_STARTED
+        if len(self.startup_times) < 2 or not STARTUP_REPORT:
+            return
+        with open(STARTUP_REPORT, 'w') as f:
+            json.dump({'first_frame_s': self.startup_times['first_frame'], 'playable_s': self.startup_times['playable'], 'finished_at': time.time()}, f)
+        if STARTUP_EXIT:
+            self.stop()
 
     def start_new_game(self):
+        self.cancel_end_popup()
+        if self.mode == 'time_attack':
+            self.stop_time_attack()
         self.guesses = []
         self.reveal_level = 0
         self.status_label.text = "[b]HoopMind[/b]\nGuess the NBA player in 6 tries!"
         self.clue_label.text = ""
         self.guess_history.text = ""
         self.guess_input.text = ""
-        self.target_player = random.choice(self.all_players)
-        info = commonplayerinfo.CommonPlayerInfo(player_id=self.target_player['id']).get_normalized_dict()
-        self.target_player_info = info['CommonPlayerInfo'][0] if info['CommonPlayerInfo'] else None
+        self.target_player = random.choice(self.target_pool)
+        self.target_player_info = self.target_player
         self.update_image()
 
     def update_image(self, force_full_res=False, reveal_actual_image=False):
-        person_id = self.target_player_info.get('PERSON_ID')
-        resolutions = [
-            None,  # 0: blank
-            '52x40',  # 1: very blurry
-            '104x76', # 2: blurry
-            '260x190', # 3: low-res
-            '520x380', # 4: mid-res
-            '1040x760' # 5: full-res
-        ]
+        from silhouette import silhouette_path, headshot_path, resolution_for_level, headshot_url, FULL_RES
+        person_id = self.target_player_info.id
         if force_full_res or reveal_actual_image:
-            res = resolutions[-1]
+            res = FULL_RES
         else:
-            reveal = min(self.reveal_level, len(resolutions) - 1)
-            res = resolutions[reveal]
+            res = resolution_for_level(self.reveal_level)
         if res is None:
+            self.wanted_image = None
             self.image_widget.source = ""
             self.image_widget.reload()
             return
-        url = f"https://cdn.nba.com/headshots/nba/latest/{res}/{person_id}.png"
         if reveal_actual_image:
-            self.image_widget.source = url
+            self.wanted_image = None
+            self.image_widget.source = headshot_path(person_id) or headshot_url(person_id, res)
             self.image_widget.reload()
             return
-        try:
-            resp = requests.get(url, timeout=3)
-            if resp.status_code == 200:
-                try:
-                    img = Image.open(BytesIO(resp.content)).convert("RGBA")
-                    gray = img.convert("L")
-                    mask = gray.point(lambda x: 0 if x > 40 else 255, mode='1')
-                    silhouette = Image.new("RGBA", img.size, (255,255,255,0))
-                    for y in range(img.size[1]):
-                        for x in range(img.size[0]):
-                            if mask.getpixel((x, y)) == 255:
-                                silhouette.putpixel((x, y), (0,0,0,255))
-                            else:
-                                silhouette.putpixel((x, y), (255,255,255,0))
-                    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-                    silhouette.save(tmp.name)
-                    self.image_widget.source = tmp.name
-                except Exception:
-                    self.image_widget.source = url
-            else:
-                blank = Image.new("RGBA", (104, 76), (255,255,255,0))
-                tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-                blank.save(tmp.name)
-                self.image_widget.source = tmp.name
-        except Exception:
-            blank = Image.new("RGBA", (104, 76), (255,255,255,0))
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-            blank.save(tmp.name)
-            self.image_widget.source = tmp.name
+        # Rendering (and any download) happens on the worker; only the newest
+        # requested image is shown when it comes back
+        key = ('silhouette', person_id, res)
+        self.wanted_image = key
+        self.worker.submit(key, silhouette_path, partial(self.set_image, key), person_id, res)
+
+    def set_image(self, key, path):
+        from silhouette import blank_path
+        if key != self.wanted_image:
+            return
+        self.image_widget.source = path or blank_path()
         self.image_widget.reload()
 
     def submit_guess(self, instance):
         guess = self.guess_input.text.strip()
-        if not guess:
+        if not guess or self.name_index is None:
             return
-        found = [p for p in self.all_players if guess.lower() in p['full_name'].lower()]
+        found = self.name_index.best_match(guess)
         if not found:
             self.status_label.text = "[color=ff0000][b]Player not found. Try again.[/b][/color]"
             return
-        player_info = commonplayerinfo.CommonPlayerInfo(player_id=found[0]['id']).get_normalized_dict()
-        if not player_info['CommonPlayerInfo']:
+        if found.flags & HAS_DETAILS:
+            self.apply_guess(found)
+            return
+        self.status_label.text = f"[b]Looking up {found.full_name}...[/b]"
+        target = self.target_player_info
+        self.worker.submit(('player', found.id), fetch_player_row, partial(self.apply_live_guess, target), found.id, found.full_name)
+
+    def apply_live_guess(self, target, guessed):
+        # Ignore lookups that finish after the game they were made in
+        if target is not self.target_player_info:
+            return
+        if guessed is None or not guessed.flags & HAS_DETAILS:
             self.status_label.text = "[color=ff0000][b]Player data not found. Try again.[/b][/color]"
             return
-        guessed = player_info['CommonPlayerInfo'][0]
-        feedback = self.compare_guess(guessed)
+        self.apply_guess(guessed)
+
+    def apply_guess(self, guessed):
+        if self.mode == 'time_attack':
+            self.apply_time_attack_guess(guessed)
+            return
+        feedback = compare_guess(guessed, self.target_player_info)
         self.guesses.append(feedback)
         self.update_guess_history()
-        if self.check_win(guessed):
-            self.reveal_level = len([None, '52x40', '104x76', '260x190', '520x380', '1040x760']) - 1
+        if check_win(guessed, self.target_player_info):
+            self.reveal_level = 5
             self.update_image(force_full_res=True, reveal_actual_image=True)
             self.status_label.text = "[color=00ff00][b]🎉 Correct! You guessed it![/b][/color]"
             self.update_streak(True)
-            from kivy.clock import Clock
-            Clock.schedule_once(lambda dt: self.show_popup(f"Correct! The player was {self.target_player_info['DISPLAY_FIRST_LAST']}\nStreak: {self.streak_data['streak']}", restart=True), 10)
+            self.schedule_end_popup(f"Correct! The player was {self.target_player_info.name}\nStreak: {self.streak_data['streak']}")
         else:
             self.reveal_level = min(self.reveal_level + 1, 5)
             self.update_image()
-            clue = self.get_player_clue(self.target_player_info['PERSON_ID'])
-            self.clue_label.text = f"{clue}"
+            self.clue_label.text = self.get_player_clue(self.target_player_info)
             if len(self.guesses) == self.max_attempts:
                 self.reveal_level = 5
                 self.update_image(force_full_res=True, reveal_actual_image=True)
-                self.status_label.text = f"[color=ff0000][b]❌ Game Over! The player was {self.target_player_info['DISPLAY_FIRST_LAST']}[/b][/color]"
+                self.status_label.text = f"[color=ff0000][b]❌ Game Over! The player was {self.target_player_info.name}[/b][/color]"
                 self.update_streak(False)
-                from kivy.clock import Clock
-                Clock.schedule_once(lambda dt: self.show_popup(f"Game Over! The player was {self.target_player_info['DISPLAY_FIRST_LAST']}\nStreak: {self.streak_data['streak']}", restart=True), 10)
+                self.schedule_end_popup(f"Game Over! The player was {self.target_player_info.name}\nStreak: {self.streak_data['streak']}")
+
+    def schedule_end_popup(self, message):
+        # The message is built now, for this game's player: a new game or a
+        # time-attack run started before it fires cancels it
+        self.cancel_end_popup()
+        self.end_popup = Clock.schedule_once(lambda dt: self.show_popup(message, restart=True), 10)
+
+    def cancel_end_popup(self):
+        if self.end_popup is not None:
+            self.end_popup.cancel()
+            self.end_popup = None
 
     def update_guess_history(self):
         text = "[b]Guesses:[/b]\n"
@@ -266,69 +361,114 @@ class NBAPlayerGuesserGUI(App):
             )
         self.guess_history.text = text
 
-    def compare_guess(self, guessed_player):
-        # Helper to get conference/division from TEAM_ABBREVIATION
-        def get_conf_div(team_abbr):
-            nba_teams = {
-                'ATL': ('East', 'Southeast'), 'BOS': ('East', 'Atlantic'), 'BKN': ('East', 'Atlantic'), 'CHA': ('East', 'Southeast'),
-                'CHI': ('East', 'Central'), 'CLE': ('East', 'Central'), 'DAL': ('West', 'Southwest'), 'DEN': ('West', 'Northwest'),
-                'DET': ('East', 'Central'), 'GSW': ('West', 'Pacific'), 'HOU': ('West', 'Southwest'), 'IND': ('East', 'Central'),
-                'LAC': ('West', 'Pacific'), 'LAL': ('West', 'Pacific'), 'MEM': ('West', 'Southwest'), 'MIA': ('East', 'Southeast'),
-                'MIL': ('East', 'Central'), 'MIN': ('West', 'Northwest'), 'NOP': ('West', 'Southwest'), 'NYK': ('East', 'Atlantic'),
-                'OKC': ('West', 'Northwest'), 'ORL': ('East', 'Southeast'), 'PHI': ('East', 'Atlantic'), 'PHX': ('West', 'Pacific'),
-                'POR': ('West', 'Northwest'), 'SAC': ('West', 'Pacific'), 'SAS': ('West', 'Southwest'), 'TOR': ('East', 'Atlantic'),
-                'UTA': ('West', 'Northwest'), 'WAS': ('East', 'Southeast')
-            }
-            return nba_teams.get(team_abbr, ('N/A', 'N/A'))
-        # Get conference/division for guessed and target
-        guessed_conf, guessed_div = get_conf_div(guessed_player.get('TEAM_ABBREVIATION'))
-        target_conf, target_div = get_conf_div(self.target_player_info.get('TEAM_ABBREVIATION'))
-        feedback = {
-            'name': guessed_player['DISPLAY_FIRST_LAST'],
-            'team': guessed_player['TEAM_ABBREVIATION'] if guessed_player['TEAM_ABBREVIATION'] else 'N/A',
-            'position': guessed_player['POSITION'] or 'N/A',
-            'height': guessed_player['HEIGHT'] if guessed_player['HEIGHT'] else 'N/A',
-            'weight': int(guessed_player['WEIGHT']) if guessed_player['WEIGHT'] else 0,
-            'conference': guessed_conf,
-            'division': guessed_div,
-            'team_match': guessed_player['TEAM_ID'] == self.target_player_info['TEAM_ID'],
-            'position_match': guessed_player['POSITION'] and self.target_player_info['POSITION'] and guessed_player['POSITION'].lower() == self.target_player_info['POSITION'].lower(),
-            'height_match': guessed_player['HEIGHT'] == self.target_player_info['HEIGHT'],
-            'weight_match': abs(int(guessed_player['WEIGHT'] or 0) - int(self.target_player_info['WEIGHT'] or 0)) <= 10 if guessed_player['WEIGHT'] and self.target_player_info['WEIGHT'] else False,
-            'conference_match': guessed_conf == target_conf and guessed_conf != 'N/A',
-            'division_match': guessed_div == target_div and guessed_div != 'N/A',
-        }
-        return feedback
-
-    def check_win(self, guessed_player):
-        return guessed_player['DISPLAY_FIRST_LAST'].lower() == self.target_player_info['DISPLAY_FIRST_LAST'].lower()
-
     def update_streak(self, won):
         if won:
             self.streak_data['streak'] += 1
         else:
             self.streak_data['streak'] = 0
-        self.streak_data['last_session'] = self.session_id
-        self.save_streak()
-
-    def get_player_clue(self, player_id):
-        try:
-            stats = playercareerstats.PlayerCareerStats(player_id=player_id).get_normalized_dict()
-            if 'CareerStats' in stats and stats['CareerStats']:
-                career = stats['CareerStats'][0]
-            elif 'CareerTotalsRegularSeason' in stats and stats['CareerTotalsRegularSeason']:
-                career = stats['CareerTotalsRegularSeason'][0]
-            else:
-                return "No stats available."
-            gp = float(career.get('GP', 0))
-            ppg = float(career.get('PTS', 0)) / gp if gp else 0
-            rpg = float(career.get('REB', 0)) / gp if gp else 0
-            apg = float(career.get('AST', 0)) / gp if gp else 0
-            return f"Clue: Career averages - PPG: {ppg:.1f}, RPG: {rpg:.1f}, APG: {apg:.1f}"
-        except Exception as e:
-            return f"Clue unavailable due to error: {e}"
+        self.streak_data['last_session'] = date.today().isoformat()
+        if self.stats is not None:
+            self.stats.record_game(LOCAL_USER, won, reset_daily=True)
+
+    def toggle_time_attack(self, instance):
+        if self.mode == 'time_attack':
+            self.finish_time_attack()
+        else:
+            self.start_time_attack()
+
+    def start_time_attack(self):
+        # Targets come from a queue drawn up front; the silhouettes of the
+        # next players are rendered on the worker while this one is played
+        import time_attack as attack
+        self.cancel_end_popup()
+        self.mode = 'time_attack'
+        self.run = attack.new_run(self.target_pool)
+        self.score = 0
+        self.time_left = attack.DURATION
+        self.mode_btn.text = "End Time Attack"
+        self.skip_btn.disabled = False
+        self.run_clock = Clock.schedule_interval(self.tick_time_attack, 0.25)
+        self.show_run_target()
+
+    def show_run_target(self, message=""):
+        import time_attack as attack
+        from silhouette import silhouette_path
+        self.target_player = self.player_table.get(self.run['target_id'])
+        self.target_player_info = self.target_player
+        self.guesses = self.run['guesses']
+        self.reveal_level = self.run['reveal_level']
+        self.score = self.run['score']
+        self.update_image()
+        self.update_guess_history()
+        clues = self.clue_table.reveal(self.target_player.id, self.reveal_level + 1) or ("No stats available.",)
+        self.clue_label.text = "\n".join(f"Clue: {clue}" for clue in clues)
+        self.update_time_attack_status(message)
+        for key in attack.prefetch_keys(self.run):
+            self.worker.submit(('silhouette',) + key, silhouette_path, lambda path: None, *key)
+
+    def update_time_attack_status(self, message=""):
+        text = f"[b]Time Attack[/b] - {int(self.time_left + 0.999)}s - Score: {self.score}"
+        self.status_label.text = f"{text}\n{message}" if message else text
+
+    def tick_time_attack(self, dt):
+        import time_attack as attack
+        self.time_left = attack.time_left(self.run)
+        if self.time_left <= 0:
+            self.finish_time_attack()
+            return False
+        self.update_time_attack_status()
+
+    def apply_time_attack_guess(self, guessed):
+        import time_attack as attack
+        if attack.expired(self.run):
+            self.finish_time_attack()
+            return
+        target = self.target_player_info
+        self.run['guesses'].append(compare_guess(guessed, target))
+        if check_win(guessed, target):
+            attack.advance(self.run, True)
+            self.show_run_target(f"[color=00ff00]Correct! {target.name}[/color]")
+        elif attack.miss(self.run):
+            self.show_run_target(f"[color=ff0000]Out of guesses: {target.name}[/color]")
+        else:
+            self.show_run_target()
+        self.guess_input.text = ""
+
+    def skip_player(self, instance):
+        import time_attack as attack
+        if self.mode != 'time_attack':
+            return
+        target = self.target_player_info
+        attack.advance(self.run, False)
+        self.show_run_target(f"Skipped: {target.name}")
+
+    def stop_time_attack(self):
+        if self.run_clock is not None:
+            self.run_clock.cancel()
+            self.run_clock = None
+        self.mode = 'original'
+        self.mode_btn.text = "Time Attack (60s)"
+        self.skip_btn.disabled = True
+
+    def finish_time_attack(self):
+        if self.mode != 'time_attack':
+            return
+        self.stop_time_attack()
+        score = self.run['score']
+        best = max(self.streak_data.get('time_attack_best', 0), score)
+        self.streak_data['time_attack_best'] = best
+        if self.stats is not None:
+            self.stats.record_time_attack(LOCAL_USER, score)
+        self.status_label.text = f"[b]Time's up![/b] You solved {score} player{'' if score == 1 else 's'}."
+        self.show_popup(f"Time's up! You solved {score} player{'' if score == 1 else 's'}.\nBest: {best}", restart=True)
+
+    def get_player_clue(self, player):
+        # One more rung of the prebuilt ladder per wrong guess
+        clues = self.clue_table.reveal(player.id, self.reveal_level) or ("No stats available.",)
+        return "\n".join(f"Clue: {clue}" for clue in clues)
 
     def show_popup(self, message, restart=False):
+        from kivy.uix.popup import Popup
         content = BoxLayout(orientation='vertical')
         content.add_widget(Label(text=message, font_size=18))
         btn = Button(text="Play Again" if restart else "OK", size_hint=(1, 0.3), font_size=18)
@@ -340,10 +480,10 @@ class NBAPlayerGuesserGUI(App):
     def update_dropdown(self, instance, value):
         from kivy.utils import get_color_from_hex
         text = value.strip().lower()
-        if not text or len(text) < 2:
+        if not text or len(text) < 2 or self.name_index is None:
             self.dropdown.dismiss()
             return
-        matches = [p['full_name'] for p in self.all_players if text in p['full_name'].lower()][:10]
+        matches = [p.full_name for p in self.name_index.search(text, limit=10)]
         if not matches:
             self.dropdown.dismiss()
             return
@@ -0,0 +1,96 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Bounded pool for blocking work: silhouette rendering, event log writes,
+# SQLite game and stats store queries, and background data reloads.
+#
+# Under sync workers a request owns its thread, so run() simply calls the
+# function. Under gevent workers (gunicorn.conf.py) everything else shares
+# one OS thread with the event loop, so run() hands the call to a real
+# thread and only the calling greenlet waits. submit() is fire-and-forget
+# (prefetching) and declines instead of queueing once the pool is full:
+# MAX_PENDING tasks waiting or running, or every thread busy under gevent.
+#
+# The pool is created per process on first use, after gunicorn has forked
+# and gevent has patched the worker.
+
+MAX_WORKERS = int(os.environ.get('HOOPMIND_BLOCKING_THREADS', 4))
+MAX_PENDING = int(os.environ.get('HOOPMIND_BLOCKING_QUEUE', 64))
+
+_lock = threading.Lock()
+_pool = None
+_pid = None
+
+
+def gevent_patched():
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+
+class ThreadPool:
+    # Plain threads, for sync and threaded workers
+    def __init__(self, max_workers, max_pending):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hoopmind-blocking')
+        self.slots = threading.BoundedSemaphore(max_pending)
+
+    def run(self, fn, *args):
+        return fn(*args)
+
+    def submit(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            return False
+        try:
+            self.executor.submit(self._call, fn, args)
+        except RuntimeError:
+            self.slots.release()
+            return False
+        return True
+
+    def _call(self, fn, args):
+        try:
+            fn(*args)
+        finally:
+            self.slots.release()
+
+
+class GeventPool:
+    # gevent's native thread pool: waiting on it yields to other greenlets.
+    # It holds one task per thread plus one; more would block the caller.
+    def __init__(self, max_workers, max_pending):
+        from gevent.threadpool import ThreadPool as NativePool
+        self.pool = NativePool(max_workers)
+        self.max_workers = max_workers
+
+    def run(self, fn, *args):
+        return self.pool.apply(fn, args)
+
+    def submit(self, fn, *args):
+        # len() is the number of tasks queued or running
+        if len(self.pool) >= self.max_workers:
+            return False
+        self.pool.spawn(fn, *args)
+        return True
+
+
+def pool():
+    global _pool, _pid
+    if _pid != os.getpid():
+        with _lock:
+            if _pid != os.getpid():
+                _pool = (GeventPool if gevent_patched() else ThreadPool)(MAX_WORKERS, MAX_PENDING)
+                _pid = os.getpid()
+    return _pool
+
+
+def run(fn, *args):
+    # fn(*args), off the event loop under gevent
+    return pool().run(fn, *args)
+
+
+def submit(fn, *args):
+    # Runs fn(*args) in the background; False if the pool is saturated
+    return pool().submit(fn, *args)
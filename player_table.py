@@ -0,0 +1,212 @@
+import json
+import mmap
+import os
+import struct
+from collections import namedtuple
+from name_index import normalize_name
+
+# Compact, precomputed player table. Built once from the cached JSON files and
+# written as a flat binary file: a header, a JSON string table and fixed-width
+# records. Loading it is one mmap plus an unpack, and gunicorn --preload keeps
+# the loaded table shared copy-on-write between workers.
+
+DATA_DIR = os.environ.get('HOOPMIND_DATA_DIR', os.path.dirname(os.path.abspath(__file__)))
+TABLE_FILE = 'player_table.bin'
+SOURCE_FILES = ('players.json', 'player_details.json', 'player_stats.json')
+
+MAGIC = b'HMPT'
+VERSION = 1
+HEADER = struct.Struct('<4sHHII')  # magic, version, record size, record count, string table bytes
+# id, team_id, full_name, name, norm_name, team_abbr, position, position_key, height
+# (string table indexes), height_in, weight, conf, div, flags, ppg, rpg, apg
+RECORD = struct.Struct('<iiIIIIIIIhhBBBxddd')
+RECORD_FIELDS = ('id', 'team_id', 'full_name', 'name', 'norm_name', 'team_abbr', 'position', 'position_key', 'height',
+                 'height_in', 'weight', 'conf', 'div', 'flags', 'ppg', 'rpg', 'apg')
+STRING_FIELDS = ('full_name', 'name', 'norm_name', 'team_abbr', 'position', 'position_key', 'height')
+
+HAS_DETAILS = 1
+HAS_STATS = 2
+
+CONFERENCES = ('N/A', 'East', 'West')
+DIVISIONS = ('N/A', 'Atlantic', 'Central', 'Southeast', 'Northwest', 'Pacific', 'Southwest')
+NBA_TEAMS = {
+    'ATL': ('East', 'Southeast'), 'BOS': ('East', 'Atlantic'), 'BKN': ('East', 'Atlantic'), 'CHA': ('East', 'Southeast'),
+    'CHI': ('East', 'Central'), 'CLE': ('East', 'Central'), 'DAL': ('West', 'Southwest'), 'DEN': ('West', 'Northwest'),
+    'DET': ('East', 'Central'), 'GSW': ('West', 'Pacific'), 'HOU': ('West', 'Southwest'), 'IND': ('East', 'Central'),
+    'LAC': ('West', 'Pacific'), 'LAL': ('West', 'Pacific'), 'MEM': ('West', 'Southwest'), 'MIA': ('East', 'Southeast'),
+    'MIL': ('East', 'Central'), 'MIN': ('West', 'Northwest'), 'NOP': ('West', 'Southwest'), 'NYK': ('East', 'Atlantic'),
+    'OKC': ('West', 'Northwest'), 'ORL': ('East', 'Southeast'), 'PHI': ('East', 'Atlantic'), 'PHX': ('West', 'Pacific'),
+    'POR': ('West', 'Northwest'), 'SAC': ('West', 'Pacific'), 'SAS': ('West', 'Southwest'), 'TOR': ('East', 'Atlantic'),
+    'UTA': ('West', 'Northwest'), 'WAS': ('East', 'Southeast')
+}
+TEAM_CODES = {abbr: (CONFERENCES.index(conf), DIVISIONS.index(div)) for abbr, (conf, div) in NBA_TEAMS.items()}
+
+PlayerRow = namedtuple('PlayerRow', RECORD_FIELDS)
+
+
+def parse_height(h):
+    if isinstance(h, int):
+        return h
+    if not h or h == 'N/A':
+        return -1
+    try:
+        if '-' in h:
+            ft, inch = h.split('-')
+            return int(ft) * 12 + int(inch)
+        return int(h)
+    except ValueError:
+        return -1
+
+
+def parse_weight(w):
+    try:
+        return int(w) if w else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def per_game(stats):
+    try:
+        gp = float(stats.get('GP', 0))
+        if not gp:
+            return 0.0, 0.0, 0.0
+        return float(stats.get('PTS', 0)) / gp, float(stats.get('REB', 0)) / gp, float(stats.get('AST', 0)) / gp
+    except (TypeError, ValueError):
+        return 0.0, 0.0, 0.0
+
+
+def build_rows(players, details, stats):
+    rows = []
+    for p in players:
+        pid = str(p['id'])
+        info = details.get(pid) or {}
+        career = stats.get(pid) or {}
+        position = info.get('POSITION', 'N/A') or ''
+        conf, div = TEAM_CODES.get(info.get('TEAM_ABBREVIATION'), (0, 0))
+        ppg, rpg, apg = per_game(career) if career else (0.0, 0.0, 0.0)
+        rows.append(PlayerRow(
+            id=int(p['id']),
+            team_id=int(info.get('TEAM_ID') or 0),
+            full_name=p['full_name'],
+            name=info.get('DISPLAY_FIRST_LAST', p['full_name']),
+            norm_name=normalize_name(p['full_name']),
+            team_abbr=info.get('TEAM_ABBREVIATION', 'N/A'),
+            position=position,
+            position_key=position.lower(),
+            height=info.get('HEIGHT', 'N/A'),
+            height_in=parse_height(info.get('HEIGHT')),
+            weight=parse_weight(info.get('WEIGHT')),
+            conf=conf,
+            div=div,
+            flags=(HAS_DETAILS if info else 0) | (HAS_STATS if career else 0),
+            ppg=ppg, rpg=rpg, apg=apg,
+        ))
+    return rows
+
+
+class PlayerTable:
+    def __init__(self, rows, records):
+        self.rows = rows
+        self.by_id = {row.id: row for row in rows}
+        # Raw fixed-width records, kept for array consumers (numpy views etc.)
+        self.records = records
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def get(self, player_id):
+        try:
+            return self.by_id.get(int(player_id))
+        except (TypeError, ValueError):
+            return None
+
+
+def encode_table(rows):
+    strings = ['']
+    string_ids = {'': 0}
+    records = bytearray()
+    for row in rows:
+        values = row._asdict()
+        for field in STRING_FIELDS:
+            s = values[field] or ''
+            if s not in string_ids:
+                string_ids[s] = len(strings)
+                strings.append(s)
+            values[field] = string_ids[s]
+        records += RECORD.pack(*(values[f] for f in RECORD_FIELDS))
+    string_blob = json.dumps(strings, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return HEADER.pack(MAGIC, VERSION, RECORD.size, len(rows), len(string_blob)) + string_blob + bytes(records)
+
+
+def decode_table(buf):
+    magic, version, record_size, count, string_len = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"not a version {VERSION} player table")
+    strings = json.loads(bytes(buf[HEADER.size:HEADER.size + string_len]).decode('utf-8'))
+    start = HEADER.size + string_len
+    records = memoryview(buf)[start:start + count * RECORD.size]
+    string_slots = [RECORD_FIELDS.index(f) for f in STRING_FIELDS]
+    rows = []
+    for values in RECORD.iter_unpack(records):
+        values = list(values)
+        for slot in string_slots:
+            values[slot] = strings[values[slot]]
+        rows.append(PlayerRow._make(values))
+    return PlayerTable(rows, records)
+
+
+def write_table(path, rows):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(encode_table(rows))
+    os.replace(tmp, path)
+
+
+def read_table(path):
+    with open(path, 'rb') as f:
+        return decode_table(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def load_json_sources(data_dir=DATA_DIR):
+    loaded = []
+    for name in SOURCE_FILES:
+        with open(os.path.join(data_dir, name)) as f:
+            loaded.append(json.load(f))
+    return loaded
+
+
+def is_stale(data_dir=DATA_DIR):
+    path = os.path.join(data_dir, TABLE_FILE)
+    if not os.path.exists(path):
+        return True
+    built = os.path.getmtime(path)
+    return any(os.path.getmtime(os.path.join(data_dir, name)) > built for name in SOURCE_FILES)
+
+
+def build_table(data_dir=DATA_DIR):
+    # Also writes the clue ladders (clues.py builds on this module)
+    from clues import build_clues
+    sources = load_json_sources(data_dir)
+    rows = build_rows(*sources)
+    write_table(os.path.join(data_dir, TABLE_FILE), rows)
+    build_clues(data_dir, sources)
+    return rows
+
+
+def load_player_table(data_dir=DATA_DIR):
+    # Prefer the prebuilt binary; fall back to building from JSON in memory
+    # when it is missing or older than the JSON it was built from.
+    if not is_stale(data_dir):
+        try:
+            return read_table(os.path.join(data_dir, TABLE_FILE))
+        except (OSError, ValueError):
+            pass
+    return decode_table(encode_table(build_rows(*load_json_sources(data_dir))))
+
+
+if __name__ == '__main__':
+    rows = build_table()
+    print(f"Wrote {len(rows)} players to {TABLE_FILE}", flush=True)
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import threading
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+# Silhouette pipeline shared by the Kivy client and the Flask app: take the
+# reveal level from the offline bundle (headshot_bundle.py) when it exists,
+# otherwise fetch the headshot and threshold it with array ops. Either way the
+# PNG lands in a content-addressed disk cache with a size cap.
+
+HEADSHOT_URL = "https://cdn.nba.com/headshots/nba/latest/{res}/{person_id}.png"
+RESOLUTIONS = [
+    None,  # 0: blank
+    '52x40',  # 1: very blurry
+    '104x76', # 2: blurry
+    '260x190', # 3: low-res
+    '520x380', # 4: mid-res
+    '1040x760' # 5: full-res
+]
+FULL_RES = RESOLUTIONS[-1]
+THRESHOLD = 40
+PIPELINE_VERSION = 1  # bump when the rendering changes so old cache entries are ignored
+
+DEFAULT_CACHE_DIR = os.environ.get('SILHOUETTE_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'silhouettes'))
+DEFAULT_CACHE_BYTES = int(os.environ.get('SILHOUETTE_CACHE_BYTES', 64 * 1024 * 1024))
+
+
+def resolution_for_level(level):
+    return RESOLUTIONS[max(0, min(level, len(RESOLUTIONS) - 1))]
+
+
+def headshot_url(person_id, res=FULL_RES):
+    return HEADSHOT_URL.format(res=res, person_id=person_id)
+
+
+def render_silhouette(image_bytes):
+    # Dark pixels become opaque black, everything else transparent white
+    img = Image.open(BytesIO(image_bytes)).convert("RGBA")
+    gray = np.asarray(img.convert("L"))
+    out = np.empty(gray.shape + (4,), dtype=np.uint8)
+    out[...] = (255, 255, 255, 0)
+    out[gray <= THRESHOLD] = (0, 0, 0, 255)
+    buf = BytesIO()
+    Image.fromarray(out, "RGBA").save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def blank_png(size=(104, 76)):
+    buf = BytesIO()
+    Image.new("RGBA", size, (255, 255, 255, 0)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def fetch_headshot(person_id, res, timeout=3):
+    import requests
+    resp = requests.get(headshot_url(person_id, res), timeout=timeout)
+    if resp.status_code != 200:
+        return None
+    return resp.content
+
+
+class SilhouetteCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.size = sum(os.path.getsize(p) for p in self._files())
+
+    def _files(self):
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.png')]
+
+    def path_for(self, person_id, res):
+        key = hashlib.sha256(f"{PIPELINE_VERSION}:{person_id}:{res}".encode()).hexdigest()
+        return os.path.join(self.directory, f"{key}.png")
+
+    def get(self, person_id, res):
+        path = self.path_for(person_id, res)
+        try:
+            os.utime(path)  # mtime doubles as last-used time for eviction
+        except OSError:
+            return None
+        return path
+
+    def put(self, person_id, res, data):
+        path = self.path_for(person_id, res)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self.lock:
+            self.size += len(data)
+            if self.size > self.max_bytes:
+                self._evict()
+        return path
+
+    def _evict(self):
+        # Drop least recently used files until the cache is 80% of its cap
+        entries = []
+        for path in self._files():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        self.size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self.size <= self.max_bytes * 0.8:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.size -= size
+
+
+_default_cache = None
+
+
+def default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SilhouetteCache()
+    return _default_cache
+
+
+def bundled(person_id, key):
+    # Prebuilt asset from headshot_bundle, if one has been built
+    from headshot_bundle import default_bundle
+    bundle = default_bundle()
+    return bundle.get(person_id, key) if bundle is not None else None
+
+
+def silhouette_path(person_id, res, cache=None, fetch=fetch_headshot):
+    # Path to the cached silhouette PNG, or None if the headshot is unavailable
+    cache = cache or default_cache()
+    path = cache.get(person_id, res)
+    if path:
+        return path
+    data = bundled(person_id, res)
+    if data is not None:
+        return cache.put(person_id, res, bytes(data))
+    try:
+        image_bytes = fetch(person_id, res)
+        if not image_bytes:
+            return None
+        return cache.put(person_id, res, render_silhouette(image_bytes))
+    except Exception:
+        return None
+
+
+def silhouette_bytes(person_id, res, cache=None, fetch=fetch_headshot):
+    # PNG bytes straight from the bundle when possible, else via the disk cache
+    data = bundled(person_id, res)
+    if data is not None:
+        return bytes(data)
+    path = silhouette_path(person_id, res, cache, fetch) or blank_path(cache)
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def headshot_path(person_id, cache=None):
+    # Local copy of the unmasked full-res headshot, or None without a bundle
+    cache = cache or default_cache()
+    path = cache.get(person_id, 'full')
+    if path:
+        return path
+    data = bundled(person_id, 'full')
+    return cache.put(person_id, 'full', bytes(data)) if data is not None else None
+
+
+def blank_path(cache=None):
+    cache = cache or default_cache()
+    return cache.get('blank', '104x76') or cache.put('blank', '104x76', blank_png())
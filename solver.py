@@ -0,0 +1,171 @@
+import math
+import multiprocessing
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+import offload
+from batch_compare import BatchComparer, MATCH_FIELDS, feedback_codes
+
+# Guess solver and difficulty scoring on top of compare_guess semantics.
+#
+# The partition table codes[g, t] holds the packed feedback a player sees when
+# guessing g against target t (see batch_compare.feedback_codes). It is built
+# once per table; every solver question after that is a few array ops over it.
+
+WIN_CODE = 1023  # never produced by feedback_codes, marks guess == target
+NUM_CODES = 1024
+CANDIDATE_BONUS = 1e-6  # breaks entropy ties in favour of guesses that can win
+# Cells per chunk when building the partition table and scoring guesses, so
+# temporaries stay a few MB however large the pool: the only allocation that
+# grows with it is codes itself, pool size squared uint16 (3000 players is
+# about 18 MB)
+CHUNK_CELLS = 1 << 18
+
+
+def feedback_code(feedback):
+    # Same packing as batch_compare.feedback_codes, for a compare_guess dict
+    code = 0
+    for bit, field in enumerate(MATCH_FIELDS):
+        if feedback.get(field):
+            code |= 1 << bit
+    arrow = {'↑': 2, '↓': 0}
+    code += arrow.get(feedback.get('height_arrow'), 1) * 64
+    code += arrow.get(feedback.get('weight_arrow'), 1) * 192
+    return code
+
+
+class Solver:
+    def __init__(self, table, player_ids=None, cache_size=256):
+        self.comparer = BatchComparer(table)
+        # Solve over a subset (e.g. players with details) if given
+        self.pool = self.comparer.to_positions(player_ids)
+        self.ids = self.comparer.ids[self.pool]
+        self.pos = {int(pid): i for i, pid in enumerate(self.ids)}
+        size = len(self.pool)
+        self.codes = np.empty((size, size), dtype=np.uint16)
+        step = max(1, CHUNK_CELLS // max(size, 1))
+        for start in range(0, size, step):
+            rows = self.pool[start:start + step]
+            self.codes[start:start + len(rows)] = feedback_codes(self.comparer.compare_positions(rows, self.pool))
+        np.fill_diagonal(self.codes, WIN_CODE)
+        self._best = OrderedDict()
+        self._cache_size = cache_size
+        self._difficulty = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def candidates(self, history):
+        # history is [(guess_id, feedback_code)], returns a boolean mask over the pool
+        mask = np.ones(len(self.ids), dtype=bool)
+        for guess_id, code in history:
+            g = self.pos.get(int(guess_id))
+            if g is None:
+                continue
+            mask &= self.codes[g] == code
+            mask[g] = code == WIN_CODE
+        return mask
+
+    def candidates_from_feedback(self, feedbacks):
+        return self.candidates([(f['player_id'], feedback_code(f)) for f in feedbacks if 'player_id' in f])
+
+    def scores(self, mask):
+        # Expected information gain (bits) of every guess in the pool, given
+        # the remaining candidates. Guess rows go in chunks of CHUNK_CELLS
+        # (guess, candidate) pairs, one offset bincount per chunk.
+        cand = np.flatnonzero(mask)
+        n = len(cand)
+        entropy = np.zeros(len(self.ids))
+        if n == 0:
+            return entropy
+        step = max(1, min(CHUNK_CELLS // n, CHUNK_CELLS // NUM_CODES))
+        offsets = (np.arange(step, dtype=np.int32) * NUM_CODES)[:, None]
+        for start in range(0, len(self.ids), step):
+            sub = self.codes[start:start + step, cand]
+            keys = sub + offsets[:len(sub)]
+            counts = np.bincount(keys.ravel(), minlength=len(sub) * NUM_CODES).reshape(len(sub), NUM_CODES)
+            p = counts / n
+            with np.errstate(divide='ignore', invalid='ignore'):
+                entropy[start:start + len(sub)] = -np.where(p > 0, p * np.log2(p), 0.0).sum(axis=1)
+        return entropy + mask * CANDIDATE_BONUS
+
+    def best_guesses(self, mask, top=5):
+        key = (mask.tobytes(), top)
+        cached = self._best.get(key)
+        if cached is not None:
+            self._best.move_to_end(key)
+            return cached
+        if mask.sum() == 1:
+            best = [(int(self.ids[np.flatnonzero(mask)[0]]), 0.0)]
+        else:
+            scores = self.scores(mask)
+            order = np.argsort(-scores, kind='stable')[:top]
+            best = [(int(self.ids[i]), float(scores[i])) for i in order]
+        self._best[key] = best
+        if len(self._best) > self._cache_size:
+            self._best.popitem(last=False)
+        return best
+
+    def _solve_depths(self, cand, depth, out):
+        # Plays the greedy policy from this candidate set, recording the guess
+        # number at which each target would be solved
+        if len(cand) == 1:
+            out[cand[0]] = depth
+            return
+        mask = np.zeros(len(self.ids), dtype=bool)
+        mask[cand] = True
+        g = self.pos[self.best_guesses(mask, top=1)[0][0]]
+        row = self.codes[g, cand]
+        for code in np.unique(row):
+            part = cand[row == code]
+            if code == WIN_CODE:
+                out[part[0]] = depth
+            else:
+                self._solve_depths(part, depth + 1, out)
+
+    def _subtree(self, part):
+        out = {}
+        self._solve_depths(part, 2, out)
+        return out
+
+    def difficulty(self, processes=None):
+        # Expected guesses to solve each target under the greedy policy,
+        # {player_id: guesses}. The first partition is split across processes.
+        if self._difficulty is not None:
+            return self._difficulty
+        everyone = np.arange(len(self.ids))
+        mask = np.ones(len(self.ids), dtype=bool)
+        g = self.pos[self.best_guesses(mask, top=1)[0][0]]
+        depths = {g: 1}
+        row = self.codes[g]
+        parts = [everyone[row == code] for code in np.unique(row) if code != WIN_CODE]
+        processes = processes if processes is not None else min(len(parts), os.cpu_count() or 1)
+        # Forking a gevent-patched process (gunicorn.conf.py) hangs the pool,
+        # so the web app scores in-process there
+        if processes > 1 and 'fork' in multiprocessing.get_all_start_methods() and not offload.gevent_patched():
+            with multiprocessing.get_context('fork').Pool(processes, initializer=_set_worker, initargs=(self,)) as pool:
+                results = pool.map(_worker_subtree, parts)
+        else:
+            results = [self._subtree(part) for part in parts]
+        for result in results:
+            depths.update(result)
+        self._difficulty = {int(self.ids[i]): d for i, d in depths.items()}
+        return self._difficulty
+
+    def expected_guesses(self):
+        scores = self.difficulty()
+        return sum(scores.values()) / len(scores) if scores else math.nan
+
+
+_worker_solver = None
+
+
+def _set_worker(solver):
+    global _worker_solver
+    _worker_solver = solver
+
+
+def _worker_subtree(part):
+    return _worker_solver._subtree(part)
@@ -0,0 +1,254 @@
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from datetime import date
+
+import offload
+
+# Persistent player stats shared by every gunicorn worker: streaks, daily
+# results, time-attack bests and the leaderboard, in one SQLite file in WAL
+# mode.
+#
+# Writes stay off the request path. The record_*() methods queue an
+# operation; a background thread per process applies them in batches, one
+# transaction per batch. Game results are upserts whose SET clauses work the
+# new streak out from the stored one, so results from different workers
+# interleave safely.
+#
+# Every write stamps the row with the next value of a global revision
+# counter. The leaderboard ranks by best streak, then wins; both only go up,
+# so each process keeps its cached top N exact by merging in the rows
+# changed since the revision it last saw. That is one indexed range read at
+# most every refresh interval, however often the board is viewed.
+
+STATS_PATH = os.environ.get('STATS_STORE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stats.sqlite3'))
+BATCH_SIZE = 128
+FLUSH_INTERVAL = 0.5
+QUEUE_SIZE = 10000
+LEADERBOARD_SIZE = 20
+REFRESH_INTERVAL = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (user_id TEXT PRIMARY KEY, name TEXT NOT NULL DEFAULT '',
+                                    streak INTEGER NOT NULL DEFAULT 0, best_streak INTEGER NOT NULL DEFAULT 0,
+                                    wins INTEGER NOT NULL DEFAULT 0, games INTEGER NOT NULL DEFAULT 0,
+                                    time_attack_best INTEGER NOT NULL DEFAULT 0, last_played TEXT, rev INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS players_rev ON players (rev);
+CREATE INDEX IF NOT EXISTS players_rank ON players (best_streak DESC, wins DESC);
+CREATE TABLE IF NOT EXISTS daily_results (date TEXT, user_id TEXT, won INTEGER, attempts INTEGER,
+                                          PRIMARY KEY (date, user_id)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta VALUES ('rev', 0);
+"""
+
+# A win extends the streak, a loss ends it. With :reset, the first game on a
+# new day starts the streak over (the desktop client's rule). last_played is
+# the day of the last streak game, so time-attack runs leave it alone.
+NEW_STREAK = """CASE WHEN excluded.wins = 0 THEN 0
+                     WHEN :reset AND players.last_played IS NOT excluded.last_played THEN 1
+                     ELSE players.streak + 1 END"""
+RECORD_GAME = f"""
+INSERT INTO players (user_id, streak, best_streak, wins, games, last_played, rev)
+VALUES (:user_id, :won, :won, :won, 1, :day, :rev)
+ON CONFLICT (user_id) DO UPDATE SET streak = {NEW_STREAK}, best_streak = max(players.best_streak, {NEW_STREAK}),
+    wins = players.wins + excluded.wins, games = players.games + 1, last_played = excluded.last_played, rev = excluded.rev
+"""
+RECORD_DAILY = "INSERT OR IGNORE INTO daily_results VALUES (:day, :user_id, :won, :attempts)"
+RECORD_TIME_ATTACK = """
+INSERT INTO players (user_id, time_attack_best, rev) VALUES (:user_id, :score, :rev)
+ON CONFLICT (user_id) DO UPDATE SET time_attack_best = max(players.time_attack_best, excluded.time_attack_best),
+    rev = excluded.rev
+"""
+SET_NAME = """
+INSERT INTO players (user_id, name, rev) VALUES (:user_id, :name, :rev)
+ON CONFLICT (user_id) DO UPDATE SET name = excluded.name, rev = excluded.rev
+"""
+RESTORE = """
+INSERT OR IGNORE INTO players (user_id, streak, best_streak, time_attack_best, last_played, rev)
+VALUES (:user_id, :streak, :streak, :time_attack_best, :day, :rev)
+"""
+OPERATIONS = {'game': RECORD_GAME, 'time_attack': RECORD_TIME_ATTACK, 'name': SET_NAME, 'restore': RESTORE}
+
+PLAYER_COLUMNS = 'user_id, name, streak, best_streak, wins, games, time_attack_best, last_played, rev'
+PlayerStats = namedtuple('PlayerStats', PLAYER_COLUMNS.split(', '))
+
+
+def rank_key(row):
+    return (-row.best_streak, -row.wins, row.user_id)
+
+
+class StatsStore:
+    def __init__(self, path=STATS_PATH, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 queue_size=QUEUE_SIZE, leaderboard_size=LEADERBOARD_SIZE, refresh_interval=REFRESH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.leaderboard_size = leaderboard_size
+        self.refresh_interval = refresh_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self._board = []
+        self._board_rev = None
+        self._synced = 0.0
+        self._board_lock = threading.Lock()
+        # Not kept: this usually runs in the gunicorn master
+        conn = self._open()
+        conn.executescript(SCHEMA)
+        conn.close()
+
+    def _open(self):
+        # Autocommit, so each batch is an explicit BEGIN IMMEDIATE transaction
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _connect(self):
+        # One connection per thread and process. Every query goes through
+        # offload.run, so under gevent that is one per blocking-pool thread
+        # rather than one per greenlet.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._open()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _start(self):
+        # Per process, like event_log.EventLog: threads do not survive a fork
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(self.queue_size)
+            self._thread = threading.Thread(target=self._run, name='hoopmind-stats', daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _submit(self, kind, **params):
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait((kind, params))
+        except queue.Full:
+            # Results are not dropped: write this one from the caller
+            offload.run(self._apply, [(kind, params)])
+
+    def record_game(self, user_id, won, day=None, reset_daily=False):
+        self._submit('game', user_id=user_id, won=int(bool(won)), day=day or date.today().isoformat(),
+                     reset=int(reset_daily))
+
+    def record_daily(self, user_id, day, won, attempts):
+        self._submit('daily', user_id=user_id, day=day, won=int(bool(won)), attempts=attempts)
+
+    def record_time_attack(self, user_id, score):
+        self._submit('time_attack', user_id=user_id, score=score)
+
+    def set_name(self, user_id, name):
+        self._submit('name', user_id=user_id, name=name)
+
+    def restore(self, user_id, streak, time_attack_best=0, day=None):
+        # Seeds a user who has no row yet (imports from older streak files)
+        self._submit('restore', user_id=user_id, streak=streak, time_attack_best=time_attack_best, day=day)
+
+    def _apply(self, batch):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rev = conn.execute("SELECT value FROM meta WHERE key = 'rev'").fetchone()[0]
+            for kind, params in batch:
+                if kind == 'daily':
+                    conn.execute(RECORD_DAILY, params)
+                    continue
+                rev += 1
+                conn.execute(OPERATIONS[kind], {**params, 'rev': rev})
+            conn.execute("UPDATE meta SET value = ? WHERE key = 'rev'", (rev,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                op = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                op = False
+            if op is None:
+                break
+            if op:
+                batch.append(op)
+            if len(batch) >= self.batch_size or (batch and time.monotonic() >= deadline):
+                self._write(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch):
+        # On a real thread under gevent, so the transaction never stalls the event loop
+        try:
+            offload.run(self._apply, batch)
+        except sqlite3.Error as e:
+            print(f"Stats store: dropped {len(batch)} updates: {e}", flush=True)
+
+    def flush(self):
+        # Waits until everything queued so far is written
+        if self._pid != os.getpid() or self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._pid = None
+
+    close = flush
+
+    def user(self, user_id):
+        row = offload.run(self._query, f"SELECT {PLAYER_COLUMNS} FROM players WHERE user_id = ?", (user_id,))
+        return PlayerStats._make(row[0]) if row else None
+
+    def daily_results(self, day):
+        return offload.run(self._query, "SELECT user_id, won, attempts FROM daily_results WHERE date = ?", (day,))
+
+    def _query(self, sql, params):
+        return self._connect().execute(sql, params).fetchall()
+
+    def leaderboard(self, limit=None):
+        # Cached top N, brought up to date at most every refresh_interval
+        if time.monotonic() - self._synced >= self.refresh_interval:
+            with self._board_lock:
+                if time.monotonic() - self._synced >= self.refresh_interval:
+                    offload.run(self._sync)
+                    self._synced = time.monotonic()
+        return self._board[:limit or self.leaderboard_size]
+
+    def _sync(self):
+        conn = self._connect()
+        if self._board_rev is None:
+            rows = conn.execute(f"SELECT {PLAYER_COLUMNS} FROM players WHERE wins > 0 "
+                                "ORDER BY best_streak DESC, wins DESC, user_id LIMIT ?", (self.leaderboard_size,))
+            self._board = [PlayerStats._make(row) for row in rows]
+            self._board_rev = conn.execute("SELECT value FROM meta WHERE key = 'rev'").fetchone()[0]
+            return
+        changed = [PlayerStats._make(row) for row in conn.execute(
+            f"SELECT {PLAYER_COLUMNS} FROM players WHERE rev > ? ORDER BY rev", (self._board_rev,))]
+        if not changed:
+            return
+        entries = {row.user_id: row for row in self._board}
+        entries.update((row.user_id, row) for row in changed if row.wins > 0)
+        self._board = sorted(entries.values(), key=rank_key)[:self.leaderboard_size]
+        self._board_rev = changed[-1].rev
+
+
+def create_stats_store():
+    return StatsStore()
@@ -0,0 +1,42 @@
+from collections import namedtuple
+
+import daily
+from player_table import HAS_DETAILS, HAS_STATS
+
+Row = namedtuple('Row', ['id', 'flags'])
+FULL = HAS_DETAILS | HAS_STATS
+
+
+class Table(list):
+    def get(self, player_id):
+        return next((row for row in self if row.id == player_id), None)
+
+
+def difficulty(ids):
+    return {pid: float(pid % 7) for pid in ids}
+
+
+def test_repair_replaces_only_ineligible_slots():
+    ids = list(range(1, 61))
+    schedule = daily.build_schedule(Table(Row(pid, FULL) for pid in ids), days=40, difficulty=difficulty(ids))
+    dropped = schedule['order'][5]
+    table = Table(Row(pid, HAS_DETAILS if pid == dropped else FULL) for pid in ids)
+    repaired = daily.repair_schedule(schedule, table, difficulty(ids))
+
+    changed = [n for n, (a, b) in enumerate(zip(schedule['order'], repaired['order'])) if a != b]
+    assert changed == [n for n, pid in enumerate(schedule['order']) if pid == dropped]
+    assert dropped not in repaired['order']
+    assert repaired['tiers'] == schedule['tiers']
+    # Same inputs, same replacement in every worker
+    assert daily.repair_schedule(schedule, table, difficulty(ids)) == repaired
+
+
+def test_repair_keeps_replacement_in_its_tier():
+    ids = list(range(1, 31))
+    scores = difficulty(ids)
+    schedule = daily.build_schedule(Table(Row(pid, FULL) for pid in ids), days=20, difficulty=scores)
+    dropped = schedule['order'][0]
+    table = Table(Row(pid, 0 if pid == dropped else FULL) for pid in ids)
+    repaired = daily.repair_schedule(schedule, table, scores)
+    tiers = daily.split_tiers([pid for pid in ids if pid != dropped], scores)
+    assert repaired['order'][0] in tiers[schedule['tiers'][0]]
@@ -0,0 +1,62 @@
+import time
+from types import SimpleNamespace
+
+import dataset
+from dataset import UNKNOWN_VERSION_CHECK_INTERVAL, DatasetHolder, data_signature
+
+
+def fake_loader(data_dir, version=None):
+    return SimpleNamespace(version=version or 'initial', players=[1, 2], target_pool=[1, 2],
+                           daily_schedule=lambda: None)
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_unknown_version_triggers_reload(tmp_path):
+    holder = DatasetHolder(str(tmp_path), interval=3600, loader=fake_loader)
+    holder._checked -= UNKNOWN_VERSION_CHECK_INTERVAL
+    (tmp_path / 'players.json').write_text('[]')
+
+    # A game started on a version another worker loaded first: served from
+    # what this worker holds while the reload runs
+    assert holder.get('from-another-worker') is not None
+    assert wait_for(lambda: holder.current().version == data_signature(str(tmp_path)))
+
+
+def test_known_version_is_served_without_check(tmp_path):
+    holder = DatasetHolder(str(tmp_path), interval=3600, loader=fake_loader)
+    (tmp_path / 'players.json').write_text('[]')
+    assert holder.get('initial').version == 'initial'
+    time.sleep(0.05)
+    assert holder.current().version == 'initial'
+
+
+def test_reload_builds_daily_schedule_before_swap(tmp_path):
+    built = []
+
+    def loader(data_dir, version=None):
+        dataset = fake_loader(data_dir, version)
+        dataset.daily_schedule = lambda: built.append(dataset.version)
+        return dataset
+
+    holder = DatasetHolder(str(tmp_path), interval=3600, loader=loader)
+    (tmp_path / 'players.json').write_text('[]')
+    assert holder.check()
+    version = data_signature(str(tmp_path))
+    assert wait_for(lambda: holder.current().version == version)
+    assert built == [version]
+
+
+def test_unknown_versions_are_throttled(tmp_path, monkeypatch):
+    holder = DatasetHolder(str(tmp_path), interval=3600, loader=fake_loader)
+    holder._checked -= UNKNOWN_VERSION_CHECK_INTERVAL
+    stats = []
+    monkeypatch.setattr(dataset, 'data_signature', lambda data_dir: stats.append(data_dir) or 'initial')
+    for n in range(50):
+        holder.get(f'junk-{n}')
+    assert len(stats) == 1
@@ -0,0 +1,36 @@
+from fetch_and_cache_players import fetch_players, stub_endpoints
+
+PLAYERS = [{'id': 201, 'full_name': 'Alpha One'}, {'id': 202, 'full_name': 'Beta Two'},
+           {'id': 203, 'full_name': 'Gamma Three'}]
+DETAILS = {'201': {'PERSON_ID': 201, 'DISPLAY_FIRST_LAST': 'Alpha One', 'TEAM_ABBREVIATION': 'BOS'},
+           '202': {'PERSON_ID': 202, 'DISPLAY_FIRST_LAST': 'Beta Two', 'TEAM_ABBREVIATION': 'LAL'}}
+STATS = {'201': {'PLAYER_ID': 201, 'GP': 100, 'PTS': 1500, 'REB': 400, 'AST': 300,
+                 'SEASONS': [[2020, 'BOS', 60, 900, 240, 180], [2021, 'BOS', 40, 600, 160, 120]]}}
+
+
+def fetch(endpoints, players=PLAYERS):
+    return fetch_players(players, endpoints=endpoints, workers=2, rate=1000, burst=1000, retries=2, passes=1,
+                         base_delay=0)
+
+
+def test_round_trips_details_and_stats():
+    results, errors = fetch(stub_endpoints(DETAILS, STATS), PLAYERS[:2])
+    assert errors == {}
+    assert results['201'] == (DETAILS['201'], STATS['201'])
+    assert results['202'] == (DETAILS['202'], {})
+
+
+def test_retries_refused_calls():
+    # Attempt 1 fails on info, attempt 2 on stats, attempt 3 gets both
+    info, stats = stub_endpoints(DETAILS, STATS, fail_first=1)
+    results, errors = fetch((info, stats), PLAYERS[:2])
+    assert errors == {}
+    assert set(results) == {'201', '202'}
+    assert info.calls == {'201': 3, '202': 3}
+    assert stats.calls == {'201': 2, '202': 2}
+
+
+def test_reports_players_that_keep_failing():
+    results, errors = fetch(stub_endpoints(DETAILS, STATS))
+    assert set(results) == {'201', '202'}
+    assert set(errors) == {'203'}
@@ -0,0 +1,25 @@
+import os
+
+import offload
+from game_store import SqliteGameStore
+
+
+def test_sqlite_store_goes_through_the_blocking_pool(tmp_path, monkeypatch):
+    calls = []
+    run = offload.run
+    monkeypatch.setattr(offload, 'run', lambda fn, *args: calls.append(fn.__name__) or run(fn, *args))
+    games = SqliteGameStore(str(tmp_path / 'games.sqlite3'))
+    games.put('g1', {'target': 7})
+    assert games.get('g1') == {'target': 7}
+    games.delete('g1')
+    assert games.get('g1') is None
+    assert calls == ['_put', '_get', '_delete', '_get']
+
+
+def test_sqlite_store_reconnects_after_fork(tmp_path, monkeypatch):
+    games = SqliteGameStore(str(tmp_path / 'games.sqlite3'))
+    conn = games._connect()
+    assert games._connect() is conn
+    pid = os.getpid()
+    monkeypatch.setattr(os, 'getpid', lambda: pid + 1)
+    assert games._connect() is not conn
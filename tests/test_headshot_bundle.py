@@ -0,0 +1,90 @@
+import functools
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from headshot_bundle import FULL, HeadshotBundle, prefetch_headshots
+from silhouette import FULL_RES, RESOLUTIONS
+
+
+def fixture_png(size, shade):
+    # Dark head on a light background, so the silhouette has both colours
+    img = Image.new("RGBA", size, (230, 230, 230, 255))
+    w, h = size
+    img.paste((shade, shade, shade, 255), (w // 4, h // 4, 3 * w // 4, h))
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def cdn(tmp_path):
+    # Serves <root>/<res>/<person_id>.png like the headshot CDN and counts requests
+    root = tmp_path / 'cdn'
+    (root / FULL_RES).mkdir(parents=True)
+    requests = []
+
+    class Handler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.path)
+            super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(Handler, directory=str(root)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield root, f"http://127.0.0.1:{server.server_address[1]}/{{res}}/{{person_id}}.png", requests
+    server.shutdown()
+    server.server_close()
+
+
+def add_headshot(root, person_id, shade=10):
+    w, h = (int(n) for n in FULL_RES.split('x'))
+    data = fixture_png((w, h), shade)
+    (root / FULL_RES / f"{person_id}.png").write_bytes(data)
+    return data
+
+
+def image_size(data):
+    return Image.open(BytesIO(bytes(data))).size
+
+
+def test_bundles_every_level(cdn, tmp_path):
+    root, url_template, _ = cdn
+    originals = {pid: add_headshot(root, pid) for pid in (101, 102)}
+    path = str(tmp_path / 'headshots.bundle')
+
+    missing = prefetch_headshots([101, 102, 103], path, url_template, workers=2, rate=100)
+
+    assert missing == [103]
+    bundle = HeadshotBundle(path)
+    assert len(bundle) == 2 and 103 not in bundle
+    for pid, original in originals.items():
+        assert set(bundle.index[str(pid)]) == {FULL, *RESOLUTIONS[1:]}
+        assert bytes(bundle.get(pid, FULL)) == original
+        for res in RESOLUTIONS[1:]:
+            assert image_size(bundle.get(pid, res)) == tuple(int(n) for n in res.split('x'))
+    assert not os.path.exists(f"{path}.tmp")
+
+
+def test_rerun_only_downloads_new_players(cdn, tmp_path):
+    root, url_template, requests = cdn
+    add_headshot(root, 101)
+    path = str(tmp_path / 'headshots.bundle')
+    prefetch_headshots([101], path, url_template, workers=1, rate=100)
+    first = bytes(HeadshotBundle(path).get(101, '52x40'))
+
+    add_headshot(root, 102, shade=200)
+    requests.clear()
+    missing = prefetch_headshots([101, 102], path, url_template, workers=1, rate=100)
+
+    assert missing == []
+    assert requests == [f"/{FULL_RES}/102.png"]
+    bundle = HeadshotBundle(path)
+    assert bytes(bundle.get(101, '52x40')) == first
+    assert 102 in bundle
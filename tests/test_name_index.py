@@ -0,0 +1,20 @@
+from name_index import NameIndex
+
+PLAYERS = [{'full_name': 'Lonzo Ball'}, {'full_name': 'LaMelo Ball'}, {'full_name': 'Nikola Jokić'},
+           {'full_name': 'Shai Gilgeous-Alexander'}]
+
+
+def best(query):
+    found = NameIndex(PLAYERS).best_match(query)
+    return found['full_name'] if found else None
+
+
+def test_typo_in_a_name():
+    assert best('lonza ball') == 'Lonzo Ball'
+    assert best('nikola jokis') == 'Nikola Jokić'
+
+
+def test_typo_that_replaces_or_drops_the_space():
+    assert best('lonzooball') == 'Lonzo Ball'
+    assert best('lonzoball') == 'Lonzo Ball'
+    assert best('gilgeousxalexander') == 'Shai Gilgeous-Alexander'
@@ -0,0 +1,21 @@
+import multiprocessing
+import os
+
+import offload
+from benchmarks.fixture import write_roster
+from player_table import load_player_table
+from solver import Solver
+
+
+def test_difficulty_does_not_fork_under_gevent(tmp_path, monkeypatch):
+    table = load_player_table(write_roster(str(tmp_path), players=60))
+    ids = [row.id for row in table.rows][:40]
+    expected = Solver(table, ids).difficulty(processes=1)
+
+    def no_fork(*args, **kwargs):
+        raise AssertionError("forked a gevent-patched process")
+
+    monkeypatch.setattr(os, 'cpu_count', lambda: 4)
+    monkeypatch.setattr(offload, 'gevent_patched', lambda: True)
+    monkeypatch.setattr(multiprocessing, 'get_context', no_fork)
+    assert Solver(table, ids).difficulty() == expected
@@ -0,0 +1,59 @@
+from datetime import date, timedelta
+
+import offload
+from stats_store import StatsStore
+
+
+def store(tmp_path):
+    return StatsStore(str(tmp_path / 'stats.sqlite3'), flush_interval=0.01, refresh_interval=0)
+
+
+def test_time_attack_does_not_carry_the_daily_streak(tmp_path):
+    # Three wins yesterday, then a time-attack run and a win today
+    today = date.today()
+    yesterday = (today - timedelta(days=1)).isoformat()
+    stats = store(tmp_path)
+    for _ in range(3):
+        stats.record_game('local', True, day=yesterday, reset_daily=True)
+    stats.flush()
+    stats.record_time_attack('local', 7)
+    stats.flush()
+    assert stats.user('local').last_played == yesterday
+    stats.record_game('local', True, day=today.isoformat(), reset_daily=True)
+    stats.flush()
+    row = stats.user('local')
+    assert (row.streak, row.best_streak, row.time_attack_best) == (1, 3, 7)
+
+
+def test_time_attack_only_user_has_not_played(tmp_path):
+    stats = store(tmp_path)
+    stats.record_time_attack('runner', 4)
+    stats.record_time_attack('runner', 2)
+    stats.flush()
+    row = stats.user('runner')
+    assert (row.time_attack_best, row.games, row.last_played) == (4, 0, None)
+
+
+def test_streak_without_daily_reset_spans_days(tmp_path):
+    stats = store(tmp_path)
+    stats.record_game('web', True, day='2026-01-01')
+    stats.record_game('web', True, day='2026-01-02')
+    stats.record_game('web', False, day='2026-01-02')
+    stats.record_game('web', True, day='2026-01-03')
+    stats.flush()
+    row = stats.user('web')
+    assert (row.streak, row.best_streak, row.wins, row.games) == (1, 2, 3, 4)
+    assert [r.user_id for r in stats.leaderboard()] == ['web']
+
+
+def test_reads_go_through_the_blocking_pool(tmp_path, monkeypatch):
+    stats = store(tmp_path)
+    stats.record_game('a', True)
+    stats.flush()
+    calls = []
+    run = offload.run
+    monkeypatch.setattr(offload, 'run', lambda fn, *args: calls.append(fn.__name__) or run(fn, *args))
+    assert [row.user_id for row in stats.leaderboard()] == ['a']
+    assert stats.user('a').wins == 1
+    assert stats.daily_results(date.today().isoformat()) == []
+    assert calls == ['_sync', '_query', '_query']
@@ -0,0 +1,68 @@
+import random
+import time
+
+from silhouette import resolution_for_level
+
+# Time-attack rules shared by the Flask app and the Kivy client: solve as
+# many players as possible before the deadline. A run is a plain dict (it is
+# stored as-is in the game store). Its targets are drawn up front, so moving
+# to the next player never waits on a lookup, and upcoming() names the ones
+# whose silhouettes are worth rendering ahead of time.
+#
+# The deadline is an absolute timestamp in the run. Every guess is checked
+# against it, so the server keeps no timers and clients only count down for
+# display.
+
+DURATION = 60
+GRACE = 1.0  # a guess sent just before the deadline still counts
+QUEUE_SIZE = 40  # the queue wraps around if a run gets through all of them
+MAX_MISSES = 6  # wrong guesses before the player is skipped
+MAX_LEVEL = 5
+PREFETCH_AHEAD = 2
+PREFETCH_LEVELS = (1, 2, 3)
+
+
+def new_run(pool, now=None, size=QUEUE_SIZE, rng=random):
+    queue = [row.id for row in rng.sample(pool, min(size, len(pool)))]
+    return {'mode': 'time_attack', 'deadline': (now or time.time()) + DURATION, 'queue': queue, 'position': 0,
+            'target_id': queue[0], 'guesses': [], 'reveal_level': 0, 'score': 0, 'skipped': 0, 'finished': False}
+
+
+def time_left(run, now=None):
+    return max(0.0, run['deadline'] - (now or time.time()))
+
+
+def expired(run, now=None):
+    return (now or time.time()) > run['deadline'] + GRACE
+
+
+def advance(run, solved):
+    # Moves on to the next queued player
+    if solved:
+        run['score'] += 1
+    else:
+        run['skipped'] += 1
+    run['position'] += 1
+    run['target_id'] = run['queue'][run['position'] % len(run['queue'])]
+    run['guesses'] = []
+    run['reveal_level'] = 0
+
+
+def miss(run):
+    # Records a wrong guess; returns True if that used up the player
+    run['reveal_level'] = min(run['reveal_level'] + 1, MAX_LEVEL)
+    if len(run['guesses']) >= MAX_MISSES:
+        advance(run, False)
+        return True
+    return False
+
+
+def upcoming(run, count=PREFETCH_AHEAD):
+    # The current target and the next ones in the queue
+    queue = run['queue']
+    return [queue[(run['position'] + i) % len(queue)] for i in range(count)]
+
+
+def prefetch_keys(run, count=PREFETCH_AHEAD):
+    # (player id, resolution) for every silhouette the next players can reach
+    return [(pid, resolution_for_level(level)) for pid in upcoming(run, count) for level in PREFETCH_LEVELS]